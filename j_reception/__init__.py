@@ -2,4 +2,7 @@
 """
 J Reception Module Initialization
 """
+from . import controllers
 from . import models
+from . import report
+from . import wizard
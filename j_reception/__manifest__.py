@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'J Reception - Building Invitations & Rental Management',
-    'version': '15.0.4.0.0',
+    'version': '15.0.4.1.0',
     'category': 'Real Estate',
     'summary': 'Manage building invitations and rental information with automated notifications',
     'description': """
@@ -30,10 +30,20 @@
         # Views
         'views/building_renter_views.xml',
         'views/reception_invitation_views.xml',
+        'views/reception_guest_views.xml',
         'views/facilities_views.xml',
         'views/duration_views.xml',
         'views/booking_views.xml',
         'views/res_config_settings_views.xml',
+
+        # Reports
+        'report/reception_report_views.xml',
+
+        # Wizards
+        'wizard/booking_recurrence_wizard_views.xml',
+        'wizard/reception_invitation_import_views.xml',
+
+        # Menus
         'views/menu_views.xml',
 ],
     'installable': True,
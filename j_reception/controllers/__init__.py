@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Controllers package initialization for J Reception module
+"""
+from . import main
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP controllers for J Reception module
+"""
+
+from odoo import http, _
+from odoo.exceptions import AccessError
+from odoo.http import request
+
+
+class ReceptionController(http.Controller):
+    """
+    JSON endpoints used by the booking calendar and kiosk clients
+    """
+
+    @http.route('/j_reception/facilities/availability', type='json', auth='user')
+    def facilities_availability(self, date_from, date_to, duration_id, facility_ids=None):
+        """
+        Return the free intervals of the facilities between two dates
+        """
+        return request.env['facilities'].get_free_slots(
+            date_from, date_to, duration_id, facility_ids=facility_ids
+        )
+
+    @http.route('/j_reception/bookings/calendar', type='json', auth='user')
+    def bookings_calendar(self, date_from, date_to, facility_ids=None, mode='events'):
+        """
+        Return the bookings of a calendar window, or their per-day totals
+        """
+        return request.env['booking'].get_calendar_feed(
+            date_from, date_to, facility_ids=facility_ids, mode=mode
+        )
+
+    @http.route('/j_reception/checkin', type='json', auth='user')
+    def checkin(self, code):
+        """
+        Check in the guest of a scanned invitation QR code
+
+        Only the reception staff scans guests in, tenants cannot.
+        """
+        if not request.env.user.has_group('j_reception.group_j_reception_admin'):
+            raise AccessError(_("Only the reception staff can check guests in."))
+        return request.env['reception.invitation']._checkin_by_code(code)
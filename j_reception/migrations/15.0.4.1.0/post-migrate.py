@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Move the building image from its base64 system parameter to attachments
+"""
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    params = env['ir.config_parameter'].sudo()
+    image = params.get_param('j_reception.building_image')
+    if image:
+        env['res.config.settings']._set_j_reception_building_image(image)
+        params.set_param('j_reception.building_image', False)
@@ -2,11 +2,20 @@
 """
 Models package initialization for J Reception module
 """
+from . import reception_role_mixin
+from . import reception_tracking_mixin
+from . import reception_archive_mixin
 from . import building_renter
 from . import reception_invitation
+from . import reception_guest
 from . import garage_slot
 from . import scheduled_payment
+from . import scheduled_payment_plan
 from . import res_config_settings
+from . import res_partner
 from . import facilities
 from . import duration
-from . import booking
\ No newline at end of file
+from . import booking
+from . import mail_mail
+from . import mail_template
+from . import ir_sequence
\ No newline at end of file
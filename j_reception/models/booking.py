@@ -3,10 +3,19 @@
 Booking model for managing facility bookings
 """
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError, UserError
-from datetime import datetime, timedelta
-import pytz
+from datetime import datetime, time, timedelta
+from dateutil.rrule import rrulestr
+import logging
+import psycopg2
+
+from ..utils import get_building_tz_name, get_timezone, format_local, to_local, to_utc
+
+_logger = logging.getLogger(__name__)
+
+# Maximum number of bookings a single recurrence rule may expand into
+MAX_RECURRING_BOOKINGS = 500
 
 
 class Booking(models.Model):
@@ -15,7 +24,7 @@ class Booking(models.Model):
     """
     _name = 'booking'
     _description = 'Booking'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'reception.tracking.mixin', 'reception.archive.mixin', 'reception.role.mixin']
     _order = 'booking_datetime desc'
 
     name = fields.Char(
@@ -68,18 +77,105 @@ class Booking(models.Model):
         compute='_compute_show_renter',
         help='Control visibility of renter field based on user permissions'
     )
+    booking_end = fields.Datetime(
+        string='End Date',
+        compute='_compute_booking_end',
+        inverse='_inverse_booking_end',
+        store=True,
+        help='Date and time at which the booking ends'
+    )
+
+    _sql_constraints = [
+        ('no_overlap',
+         "EXCLUDE USING gist (facility_id WITH =, "
+         "tsrange(booking_datetime, COALESCE(booking_end, booking_datetime)) WITH &&) "
+         "DEFERRABLE INITIALLY DEFERRED",
+         'The facility is already booked for this time. Please choose a different time.'),
+    ]
+
+    def _auto_init(self):
+        """
+        Make sure btree_gist is available before the overlap exclusion constraint is added
+        """
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        except psycopg2.Error:
+            _logger.warning(
+                "Could not enable the btree_gist extension, booking overlaps "
+                "will only be checked by the Python constraint."
+            )
+        return super(Booking, self)._auto_init()
+
+    def init(self):
+        """
+        Indexes used by the booking overlap and daily limit lookups
+        """
+        tools.create_index(
+            self._cr, 'booking_facility_interval_idx', self._table,
+            ['facility_id', 'booking_datetime', 'booking_end']
+        )
+        tools.create_index(
+            self._cr, 'booking_renter_datetime_idx', self._table,
+            ['renter_id', 'booking_datetime']
+        )
+        # Partial indexes covering the working set only, archived history
+        # does not grow them
+        if not tools.index_exists(self._cr, 'booking_active_facility_interval_idx'):
+            self._cr.execute("""
+                CREATE INDEX booking_active_facility_interval_idx
+                    ON booking (facility_id, booking_datetime, booking_end)
+                 WHERE active
+            """)
+        if not tools.index_exists(self._cr, 'booking_active_datetime_idx'):
+            self._cr.execute("""
+                CREATE INDEX booking_active_datetime_idx
+                    ON booking (booking_datetime DESC)
+                 WHERE active
+            """)
+
+    @api.depends('booking_datetime', 'duration_id.minutes')
+    def _compute_booking_end(self):
+        """
+        Compute the end of the booking from its start and duration
+        """
+        for record in self:
+            if record.booking_datetime and record.duration_id:
+                record.booking_end = record.booking_datetime + timedelta(minutes=record.duration_id.minutes)
+            else:
+                record.booking_end = False
+
+    def _inverse_booking_end(self):
+        """
+        Set the duration matching the new end, as when resizing a booking in the calendar
+        """
+        records = self.filtered(lambda record: record.booking_datetime and record.booking_end)
+        minutes_by_record = {
+            record: int((record.booking_end - record.booking_datetime).total_seconds() // 60)
+            for record in records
+        }
+        durations = {}
+        for duration in self.env['duration'].search([('minutes', 'in', list(set(minutes_by_record.values())))]):
+            durations.setdefault(duration.minutes, duration)
+        for record, minutes in minutes_by_record.items():
+            if minutes not in durations:
+                raise UserError(
+                    _("There is no %s minutes booking duration, please choose one of the available durations.") % minutes
+                )
+            if record.duration_id != durations[minutes]:
+                record.duration_id = durations[minutes]
 
     @api.depends('facility_id', 'booking_datetime', 'renter_id')
     def _compute_name(self):
         """
         Compute the display name for the booking
         """
+        # The stored name is built in the building timezone, so it does not
+        # depend on the user triggering the recompute
+        building_tz = get_building_tz_name(self.env)
         for record in self:
             if record.facility_id and record.booking_datetime:
-                # Convert UTC datetime to user's timezone for display
-                user_tz = pytz.timezone(record.env.user.tz or 'Asia/Riyadh')
-                booking_date_local = pytz.utc.localize(record.booking_datetime).astimezone(user_tz)
-                booking_date = booking_date_local.strftime('%Y-%m-%d %H:%M')
+                booking_date = format_local(record.booking_datetime, building_tz)
                 record.name = f"{record.facility_id.name} - {booking_date}"
             else:
                 record.name = _('Draft Booking')
@@ -88,7 +184,7 @@ class Booking(models.Model):
         """
         Get default renter based on current user's officer relationship
         """
-        renter = self.env['building.renter'].search([('officer_id', '=', self.env.user.id)], limit=1)
+        renter = self.env['building.renter']._get_renter_for_officer(self.env.uid)
         return renter.id if renter else False
 
     @api.depends('renter_id')
@@ -96,12 +192,11 @@ class Booking(models.Model):
         """
         Control visibility of renter field based on user permissions
         """
+        role = self._get_reception_role()
         for record in self:
-            # Check if user has admin group
-            if self.env.user.has_group('j_reception.group_j_reception_admin'):
+            if role == 'admin':
                 record.show_renter = True
-            # Check if user has tenant group
-            elif self.env.user.has_group('j_reception.group_j_reception_renter'):
+            elif role == 'tenant':
                 # Show only if current user is officer of the renter in this booking
                 if record.renter_id.sudo() and record.renter_id.sudo().officer_id == self.env.user:
                     record.show_renter = True
@@ -110,77 +205,219 @@ class Booking(models.Model):
             else:
                 record.show_renter = False
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Override create to expand recurring bookings
+
+        Values holding a 'recurrence_rule' RRULE string expand into one booking
+        per occurrence, the first one starting at booking_datetime. All bookings
+        are created in one batch, so conflicts and daily limits are validated
+        once for the whole batch. The values of the caller are left untouched.
+        """
+        expanded_vals_list = []
+        for vals in vals_list:
+            vals = dict(vals)
+            rule = vals.pop('recurrence_rule', None)
+            if rule:
+                for start in self._expand_recurrence(vals.get('booking_datetime'), rule):
+                    expanded_vals_list.append(dict(vals, booking_datetime=start))
+            else:
+                expanded_vals_list.append(vals)
+        return super(Booking, self).create(expanded_vals_list)
+
+    @api.model
+    def _expand_recurrence(self, start, rule):
+        """
+        Return the UTC start datetimes of the occurrences of an RRULE
+
+        The rule is expanded in the user's timezone, so that a weekly booking
+        keeps the same local time across daylight saving changes. The start is
+        always the first occurrence, even when the rule does not match it, e.g.
+        a BYDAY list without its weekday; COUNT then counts the occurrences
+        following it.
+        """
+        start = fields.Datetime.to_datetime(start)
+        if not start:
+            raise UserError(_("A recurring booking needs a first booking date."))
+        if 'COUNT=' not in rule.upper() and 'UNTIL=' not in rule.upper():
+            raise UserError(_("A recurring booking needs an end date or a number of occurrences."))
+
+        user_tz = self.env.user.tz
+        local_start = to_local(start, user_tz).replace(tzinfo=None)
+        recurrence = rrulestr(rule, dtstart=local_start, forceset=True)
+        recurrence.rdate(local_start)
+        occurrences = []
+        for occurrence in recurrence:
+            if len(occurrences) >= MAX_RECURRING_BOOKINGS:
+                raise UserError(
+                    _("A recurring booking cannot create more than %s bookings.") % MAX_RECURRING_BOOKINGS
+                )
+            occurrences.append(to_utc(occurrence, user_tz))
+        return occurrences
+
+    @api.model
+    def _find_booking_conflicts(self, intervals, exclude_ids=()):
+        """
+        Find the candidate intervals overlapping existing bookings or each other
+
+        The existing bookings overlapping any candidate are fetched with one
+        query, then sorted together with the candidates and scanned in a single
+        sweep per facility.
+
+        :param intervals: list of (facility_id, start, end) tuples in UTC
+        :param exclude_ids: ids of bookings to ignore, e.g. the ones being validated
+        :return: sorted list of (index, conflict_start, conflict_end), index
+                 referring to the conflicting candidate in intervals
+        """
+        if not intervals:
+            return []
+
+        # Bookings created or moved earlier in the transaction must be in the table
+        self.flush(['facility_id', 'booking_datetime', 'booking_end', 'active'])
+        self.env.cr.execute("""
+            SELECT DISTINCT b.facility_id, b.booking_datetime, b.booking_end
+              FROM unnest(%s::int[], %s::timestamp[], %s::timestamp[])
+                   AS c(facility_id, start_at, end_at)
+              JOIN booking b
+                ON b.facility_id = c.facility_id
+               AND b.booking_datetime < c.end_at
+               AND b.booking_end > c.start_at
+               AND b.active
+             WHERE b.id != ALL(%s)
+        """, (
+            [interval[0] for interval in intervals],
+            [interval[1] for interval in intervals],
+            [interval[2] for interval in intervals],
+            list(exclude_ids),
+        ))
+        events = [(facility_id, start, end, None) for facility_id, start, end in self.env.cr.fetchall()]
+        events += [(facility_id, start, end, index) for index, (facility_id, start, end) in enumerate(intervals)]
+        events.sort(key=lambda event: event[:3])
+
+        # Sweep: 'last' is the interval reaching furthest in the current facility
+        conflicts = {}
+        last = None
+        for event in events:
+            facility_id, start, end, index = event
+            if last and last[0] == facility_id and start < last[2]:
+                if index is not None:
+                    conflicts.setdefault(index, (last[1], last[2]))
+                elif last[3] is not None:
+                    conflicts.setdefault(last[3], (start, end))
+            if not last or last[0] != facility_id or end > last[2]:
+                last = event
+        return sorted((index, start, end) for index, (start, end) in conflicts.items())
+
     @api.constrains('facility_id', 'booking_datetime', 'duration_id')
     def _check_booking_conflict(self):
         """
         Ensure no booking conflicts for the same facility
         """
-        for record in self:
-            if record.facility_id and record.booking_datetime and record.duration_id:
-                # Calculate end time
-                end_time = record.booking_datetime + timedelta(minutes=record.duration_id.minutes)
-
-                # Check for overlapping bookings
-                existing_bookings = self.search([
-                    ('facility_id', '=', record.facility_id.id),
-                    ('id', '!=', record.id)
-                ])
-
-                for booking in existing_bookings:
-                    existing_end_time = booking.booking_datetime + timedelta(minutes=booking.duration_id.minutes)
-
-                    # Check if times overlap
-                    if (record.booking_datetime < existing_end_time and 
-                        end_time > booking.booking_datetime):
-                        # Convert times to user's timezone for error message
-                        user_tz = pytz.timezone(record.env.user.tz or 'Asia/Riyadh')
-                        booking_start_local = pytz.utc.localize(booking.booking_datetime).astimezone(user_tz)
-                        booking_end_local = pytz.utc.localize(existing_end_time).astimezone(user_tz)
-
-                        raise ValidationError(
-                            _("The facility '%s' is already booked from %s to %s. Please choose a different time.") % (
-                                record.facility_id.name,
-                                booking_start_local.strftime('%Y-%m-%d %H:%M'),
-                                booking_end_local.strftime('%Y-%m-%d %H:%M')
-                            )
-                        )
+        records = self.filtered(lambda record: record.facility_id and record.booking_datetime and record.booking_end)
+        # Bounded overlap lookup served by booking_facility_interval_idx;
+        # the exclusion constraint covers concurrent transactions. It is
+        # deferred to the commit, so that flushing the bookings being
+        # validated reports the conflict below rather than a database error.
+        conflicts = self._find_booking_conflicts(
+            [(record.facility_id.id, record.booking_datetime, record.booking_end) for record in records],
+            exclude_ids=records.ids
+        )
+        if conflicts:
+            # Convert times to user's timezone for error message
+            user_tz = self.env.user.tz
+            messages = []
+            for index, existing_start, existing_end in conflicts:
+                messages.append(
+                    _("The facility '%s' is already booked from %s to %s. Please choose a different time.") % (
+                        records[index].facility_id.name,
+                        format_local(existing_start, user_tz),
+                        format_local(existing_end, user_tz)
+                    )
+                )
+            raise ValidationError('\n'.join(messages))
 
     @api.constrains('renter_id', 'booking_datetime', 'duration_id')
     def _check_daily_booking_limit(self):
         """
         Check if tenant exceeds daily booking limit
         """
+        # Get daily booking limit from settings
+        daily_limit = int(self.env['ir.config_parameter'].sudo().get_param('j_reception.daily_booking_limit', 0))
+        if daily_limit <= 0:
+            return
+
+        # Group the bookings by tenant and day, the day being taken in the
+        # timezone of the tenant's officer
+        windows = {}
         for record in self:
-            if record.renter_id.sudo() and record.booking_datetime and record.duration_id:
-                # Get daily booking limit from settings
-                daily_limit = int(self.env['ir.config_parameter'].sudo().get_param('j_reception.daily_booking_limit', 0))
-
-                if daily_limit > 0:
-                    # Get start and end of the booking day
-                    booking_date = record.booking_datetime.date()
-                    day_start = datetime.combine(booking_date, datetime.min.time())
-                    day_end = datetime.combine(booking_date, datetime.max.time())
-
-                    # Find all bookings for this renter on the same day
-                    same_day_bookings = self.search([
-                        ('renter_id', '=', record.renter_id.sudo().id),
-                        ('booking_datetime', '>=', day_start),
-                        ('booking_datetime', '<=', day_end),
-                        ('id', '!=', record.id)
-                    ])
-
-                    # Calculate total minutes booked
-                    total_minutes = sum(booking.duration_id.minutes for booking in same_day_bookings)
-                    total_minutes += record.duration_id.minutes
-
-                    if total_minutes > daily_limit:
-                        raise ValidationError(
-                            _("Daily booking limit exceeded. You can only book %s minutes per day. Currently booked: %s minutes. Trying to book: %s minutes.") % (
-                                daily_limit,
-                                total_minutes - record.duration_id.minutes,
-                                record.duration_id.minutes
-                            )
-                        )
+            renter = record.renter_id.sudo()
+            if renter and record.booking_datetime and record.duration_id:
+                renter_tz = renter.officer_id.tz
+                booking_date = to_local(record.booking_datetime, renter_tz).date()
+                key = (renter.id, booking_date)
+                if key not in windows:
+                    windows[key] = {
+                        'day_start': to_utc(datetime.combine(booking_date, time.min), renter_tz),
+                        'day_end': to_utc(datetime.combine(booking_date + timedelta(days=1), time.min), renter_tz),
+                        'minutes': 0,
+                    }
+                windows[key]['minutes'] += record.duration_id.minutes
+
+        if not windows:
+            return
+
+        # Sum the minutes already booked in every window with a single query;
+        # the bookings being validated are counted from the cache above
+        keys = list(windows)
+        # Bookings created or moved earlier in the transaction must be in the table
+        self.flush(['renter_id', 'booking_datetime', 'booking_end', 'active'])
+        self.env.cr.execute("""
+            SELECT w.idx,
+                   COALESCE(SUM(EXTRACT(EPOCH FROM b.booking_end - b.booking_datetime)) / 60, 0)
+              FROM unnest(%s::int[], %s::int[], %s::timestamp[], %s::timestamp[])
+                   AS w(idx, renter_id, day_start, day_end)
+              LEFT JOIN booking b
+                     ON b.renter_id = w.renter_id
+                    AND b.booking_datetime >= w.day_start
+                    AND b.booking_datetime < w.day_end
+                    AND b.active
+                    AND b.id != ALL(%s)
+             GROUP BY w.idx
+        """, (
+            list(range(len(keys))),
+            [key[0] for key in keys],
+            [windows[key]['day_start'] for key in keys],
+            [windows[key]['day_end'] for key in keys],
+            self.ids,
+        ))
+        booked_minutes = dict(self.env.cr.fetchall())
+
+        for idx, key in enumerate(keys):
+            already_booked = int(booked_minutes.get(idx, 0))
+            requested = windows[key]['minutes']
+            if already_booked + requested > daily_limit:
+                raise ValidationError(
+                    _("Daily booking limit exceeded. You can only book %s minutes per day. Currently booked: %s minutes. Trying to book: %s minutes.") % (
+                        daily_limit,
+                        already_booked,
+                        requested
+                    )
+                )
+
+    @api.model
+    def _get_reception_archive_domain(self, cutoff):
+        """
+        Bookings ended before the cutoff are archived
+        """
+        return [('booking_end', '<', cutoff)]
+
+    @api.model
+    def _get_reception_chatter_retention_domain(self, cutoff):
+        """
+        Past bookings can have their chatter compacted
+        """
+        return [('booking_end', '<', cutoff)]
 
     @api.constrains('booking_datetime')
     def _check_future_datetime(self):
@@ -195,14 +432,11 @@ class Booking(models.Model):
                 # Add a 1 minute buffer to avoid immediate expiration
                 if record.booking_datetime <= now_utc:
                     # Convert times to user's timezone for error message
-                    user_tz = pytz.timezone(record.env.user.tz or 'Asia/Riyadh')
-                    booking_local = pytz.utc.localize(record.booking_datetime).astimezone(user_tz)
-                    now_local = pytz.utc.localize(now_utc).astimezone(user_tz)
-
+                    user_tz = record.env.user.tz
                     raise ValidationError(
                         _("Booking time must be in the future. Selected time: %s Current time: %s Please select a future date and time.") % (
-                            booking_local.strftime('%Y-%m-%d %H:%M'),
-                            now_local.strftime('%Y-%m-%d %H:%M')
+                            format_local(record.booking_datetime, user_tz),
+                            format_local(now_utc, user_tz)
                         )
                     )
 
@@ -210,17 +444,117 @@ class Booking(models.Model):
         """
         Override write method to control edit permissions for tenant users
         """
-        # Check if user has admin group - allow all edits
-        if self.env.user.has_group('j_reception.group_j_reception_admin'):
-            return super(Booking, self).write(vals)
-
-        # Check if user has tenant group - restrict edits
-        if self.env.user.has_group('j_reception.group_j_reception_renter'):
-            for record in self:
-                # Check if current user is officer of the renter for this booking
-                if not (record.renter_id.sudo() and record.renter_id.sudo().officer_id == self.env.user):
-                    raise UserError(
-                        _("You are not authorized to edit this booking. You can only edit bookings for tenants where you are the officer.")
+        # Only ended bookings can be archived: the conflict and availability
+        # lookups skip archived bookings, while the exclusion constraint does not
+        if 'active' in vals and not vals['active']:
+            now = fields.Datetime.now()
+            running = self.filtered(lambda record: record.active and record.booking_end and record.booking_end > now)
+            if running:
+                raise UserError(
+                    _("Only past bookings can be archived, cancel upcoming bookings instead: %s") % (
+                        ', '.join(running.mapped('name'))
                     )
+                )
+
+        # Admins can edit everything, tenants only their own bookings, as
+        # enforced by booking_rule_renter_write_own; the rule is checked for
+        # the whole recordset in one query to report every unauthorized booking
+        if self._get_reception_role() == 'tenant':
+            unauthorized = self - self._filter_access_rules('write')
+            if unauthorized:
+                raise UserError(
+                    _("You are not authorized to edit these bookings: %s. You can only edit bookings for tenants where you are the officer.") % (
+                        ', '.join(str(booking_id) for booking_id in unauthorized.ids)
+                    )
+                )
+
+        return super(Booking, self).write(vals)
+
+    @api.model
+    def get_calendar_feed(self, date_from, date_to, facility_ids=None, mode='events'):
+        """
+        Return the bookings of a calendar window, or their per-day totals
+
+        Only the active bookings overlapping the window and readable by the
+        user are returned, read with a single query. Tenant labels are masked
+        like in the views: administrators see every tenant, tenants only
+        themselves, other bookings being labelled as booked.
+
+        :param date_from: start of the window (UTC datetime or string)
+        :param date_to: end of the window (UTC datetime or string)
+        :param facility_ids: ids of the facilities to show, all facilities when empty
+        :param mode: 'events' for one entry per booking, 'day' for one entry
+                     per day and facility, the day being taken in the user's timezone
+        :return: list of dicts; events have id, start, end (UTC strings),
+                 facility_id, facility_name, tenant and own; days have date,
+                 facility_id, facility_name, booking_count and booked_minutes
+        """
+        date_from = fields.Datetime.to_datetime(date_from)
+        date_to = fields.Datetime.to_datetime(date_to)
+        if not date_from or not date_to or date_from >= date_to:
+            raise UserError(_("The end of the calendar window must be after its start."))
+        if mode not in ('events', 'day'):
+            raise UserError(_("Unknown calendar feed mode: %s") % mode)
+
+        self.check_access_rights('read')
+        domain = [('booking_datetime', '<', date_to), ('booking_end', '>', date_from)]
+        if facility_ids:
+            domain.append(('facility_id', 'in', facility_ids))
+        # Both queries below read the table, bookings created or moved earlier
+        # in the transaction must be written to it first
+        self._flush_search(domain, fields=['facility_id', 'booking_datetime', 'booking_end', 'renter_id', 'active'])
+        query = self._where_calc(domain)
+        self._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+
+        if mode == 'day':
+            self.env.cr.execute("""
+                SELECT (booking.booking_datetime AT TIME ZONE 'UTC' AT TIME ZONE %%s)::date AS day,
+                       booking.facility_id,
+                       COUNT(*),
+                       SUM(EXTRACT(EPOCH FROM booking.booking_end - booking.booking_datetime)) / 60
+                  FROM %s
+                 WHERE %s
+                 GROUP BY 1, 2
+                 ORDER BY 1, 2
+            """ % (from_clause, where_clause), [get_timezone(self.env.user.tz).zone] + params)
+            rows = self.env.cr.fetchall()
+            facility_names = dict(self.env['facilities'].browse({row[1] for row in rows}).sudo().name_get())
+            return [{
+                'date': fields.Date.to_string(day),
+                'facility_id': facility_id,
+                'facility_name': facility_names.get(facility_id, ''),
+                'booking_count': booking_count,
+                'booked_minutes': int(booked_minutes or 0),
+            } for day, facility_id, booking_count, booked_minutes in rows]
+
+        self.env.cr.execute("""
+            SELECT booking.id, booking.facility_id, booking.booking_datetime,
+                   booking.booking_end, booking.renter_id
+              FROM %s
+             WHERE %s
+             ORDER BY booking.booking_datetime, booking.id
+        """ % (from_clause, where_clause), params)
+        rows = self.env.cr.fetchall()
+        facility_names = dict(self.env['facilities'].browse({row[1] for row in rows}).sudo().name_get())
+
+        # Resolve the tenant labels the user is allowed to see
+        role = self._get_reception_role()
+        own_renter_id = self.env['building.renter']._get_renter_for_officer(self.env.uid).id
+        if role == 'admin':
+            renter_names = dict(self.env['building.renter'].browse({row[4] for row in rows}).sudo().name_get())
+        elif own_renter_id:
+            renter_names = dict(self.env['building.renter'].browse(own_renter_id).sudo().name_get())
+        else:
+            renter_names = {}
+        booked_label = _('Booked')
 
-        return super(Booking, self).write(vals)
\ No newline at end of file
+        return [{
+            'id': booking_id,
+            'start': fields.Datetime.to_string(start),
+            'end': fields.Datetime.to_string(end),
+            'facility_id': facility_id,
+            'facility_name': facility_names.get(facility_id, ''),
+            'tenant': renter_names.get(renter_id, booked_label),
+            'own': bool(own_renter_id) and renter_id == own_renter_id,
+        } for booking_id, facility_id, start, end, renter_id in rows]
@@ -3,8 +3,12 @@
 Building Renter model for managing building rental information
 """
 
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError, ValidationError
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
 
 
 class BuildingRenter(models.Model):
@@ -52,11 +56,42 @@ class BuildingRenter(models.Model):
         string='Scheduled Payments',
         help='List of scheduled payments for this renter'
     )
+    payment_plan_ids = fields.One2many(
+        'scheduled.payment.plan',
+        'renter_id',
+        string='Payment Plans',
+        help='Recurring payment plans of this renter'
+    )
+    upcoming_payment_summary = fields.Char(
+        string='Upcoming Payments',
+        compute='_compute_payment_summary',
+        help='Total of the unpaid payments due from today on, per currency'
+    )
+    overdue_payment_summary = fields.Char(
+        string='Overdue Payments',
+        compute='_compute_payment_summary',
+        help='Total of the unpaid payments past their due date, per currency'
+    )
     invitation_count = fields.Integer(
         string='Invitation Count',
         compute='_compute_invitation_count',
         help='Number of invitations created for this renter'
     )
+    scheduled_invitation_count = fields.Integer(
+        string='Scheduled Invitations',
+        compute='_compute_invitation_count',
+        help='Number of scheduled invitations for this renter'
+    )
+    attended_invitation_count = fields.Integer(
+        string='Attended Invitations',
+        compute='_compute_invitation_count',
+        help='Number of attended invitations for this renter'
+    )
+    overdue_invitation_count = fields.Integer(
+        string='Overdue Invitations',
+        compute='_compute_invitation_count',
+        help='Number of overdue invitations for this renter'
+    )
     floor = fields.Char(
         string='Floor',
         help='The floor number or name where the rented unit is located (e.g., 2, Ground, Mezzanine).'
@@ -78,6 +113,115 @@ class BuildingRenter(models.Model):
             else:
                 record.name = 'Draft Renter'
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Override create to invalidate the officer to renter mapping
+        """
+        renters = super(BuildingRenter, self).create(vals_list)
+        self.clear_caches()
+        renters._sync_invitation_renters(renters.officer_id)
+        return renters
+
+    def write(self, vals):
+        """
+        Override write to invalidate the officer to renter mapping
+        """
+        old_officers = self.officer_id if 'officer_id' in vals else self.env['res.users']
+        result = super(BuildingRenter, self).write(vals)
+        if 'officer_id' in vals or 'company_id' in vals:
+            self.clear_caches()
+        if 'officer_id' in vals:
+            self._sync_invitation_renters(old_officers | self.officer_id)
+        return result
+
+    def unlink(self):
+        """
+        Override unlink to invalidate the officer to renter mapping
+
+        Invitations keep their renter for the history, so renters who have
+        any, archived ones included, cannot be deleted.
+        """
+        invitation_count = self.env['reception.invitation'].sudo().with_context(active_test=False).search_count([
+            ('renter_id', 'in', self.ids)
+        ])
+        if invitation_count:
+            raise UserError(
+                f"These renters cannot be deleted because they have {invitation_count} invitation(s). "
+                f"Assign their officer to another renter first."
+            )
+        result = super(BuildingRenter, self).unlink()
+        self.clear_caches()
+        return result
+
+    @api.model
+    def _sync_invitation_renters(self, officers):
+        """
+        Update the stored renter of the invitations of the given officers
+
+        Runs a single set-based UPDATE from the officer to renter mapping.
+        Invitations of an officer who no longer has any renter keep their renter.
+        The guest directory lines of the moved invitations are rebuilt for both
+        their former and their new renter.
+        """
+        if not officers:
+            return
+        officer_renter_map = self._get_officer_renter_map()
+        Invitation = self.env['reception.invitation']
+        Invitation.flush(['officer_id', 'renter_id', 'guest_partner_id'])
+        # The self join reads the rows as they were before the update
+        self.env.cr.execute("""
+            UPDATE reception_invitation AS invitation
+               SET renter_id = mapping.renter_id
+              FROM unnest(%s::int[], %s::int[]) AS mapping(officer_id, renter_id),
+                   reception_invitation AS previous
+             WHERE invitation.officer_id = mapping.officer_id
+               AND previous.id = invitation.id
+               AND mapping.renter_id IS NOT NULL
+               AND invitation.renter_id IS DISTINCT FROM mapping.renter_id
+         RETURNING invitation.id, previous.renter_id, invitation.renter_id, invitation.guest_partner_id
+        """, (officers.ids, [officer_renter_map.get(officer_id) for officer_id in officers.ids]))
+        rows = self.env.cr.fetchall()
+        invitations = Invitation.browse([row[0] for row in rows])
+        if invitations:
+            # Refresh the cache and recompute the fields depending on the renter
+            invitations.invalidate_cache(['renter_id'])
+            invitations.modified(['renter_id'])
+            pairs = set()
+            for dummy, old_renter_id, new_renter_id, partner_id in rows:
+                if partner_id:
+                    pairs.update({(old_renter_id, partner_id), (new_renter_id, partner_id)})
+            self.env['reception.guest'].sudo()._rebuild_guests(pairs)
+
+    @api.model
+    @tools.ormcache()
+    def _get_officer_renter_map(self):
+        """
+        Return a mapping {officer user id: renter id} built with one query
+
+        When an officer is assigned to several renters, the first one by name
+        is kept, like the former search(..., limit=1) did. The mapping is cached
+        and invalidated whenever renters are created, reassigned or deleted.
+        """
+        self.flush(['officer_id', 'name'])
+        self.env.cr.execute("""
+            SELECT officer_id, id
+              FROM building_renter
+             WHERE officer_id IS NOT NULL
+             ORDER BY name, id
+        """)
+        officer_renter_map = {}
+        for officer_id, renter_id in self.env.cr.fetchall():
+            officer_renter_map.setdefault(officer_id, renter_id)
+        return officer_renter_map
+
+    @api.model
+    def _get_renter_for_officer(self, officer_id):
+        """
+        Return the renter for which the given user id is the officer
+        """
+        return self.browse(self._get_officer_renter_map().get(officer_id))
+
     @api.constrains('company_id')
     def _check_unique_company_officer(self):
         """
@@ -97,12 +241,75 @@ class BuildingRenter(models.Model):
 
     def _compute_invitation_count(self):
         """
-        Compute the number of invitations for this renter
+        Compute the number of invitations for this renter, in total and per state
         """
+        counts = {}
+        renter_ids = [renter_id for renter_id in self._origin.ids if renter_id]
+        if renter_ids:
+            # Archived history is counted as well
+            groups = self.env['reception.invitation'].with_context(active_test=False).read_group(
+                [('renter_id', 'in', renter_ids)],
+                ['renter_id', 'state'],
+                ['renter_id', 'state'],
+                lazy=False
+            )
+            for group in groups:
+                counts.setdefault(group['renter_id'][0], {})[group['state']] = group['__count']
+
         for record in self:
-            record.invitation_count = self.env['reception.invitation'].search_count([
-                ('renter_id', '=', record.id)
-            ])
+            record_counts = counts.get(record._origin.id, {})
+            record.invitation_count = sum(record_counts.values())
+            record.scheduled_invitation_count = record_counts.get('scheduled', 0)
+            record.attended_invitation_count = record_counts.get('attended', 0)
+            record.overdue_invitation_count = record_counts.get('overdue', 0)
+
+    def _get_outstanding_payment_totals(self):
+        """
+        Return {renter id: (upcoming, overdue)} of the unpaid payments, each a {currency: total}
+
+        Upcoming payments are due from today on, overdue ones before today; both
+        totals come from one grouped query.
+        """
+        totals = {}
+        renter_ids = [renter_id for renter_id in self._origin.ids if renter_id]
+        if renter_ids:
+            Payment = self.env['scheduled.payment']
+            Payment.flush(['renter_id', 'currency_id', 'amount', 'due_date', 'is_paid'])
+            query = Payment._where_calc([('renter_id', 'in', renter_ids), ('is_paid', '=', False)])
+            Payment._apply_ir_rules(query, 'read')
+            from_clause, where_clause, where_params = query.get_sql()
+            self.env.cr.execute("""
+                SELECT "scheduled_payment".renter_id, "scheduled_payment".currency_id,
+                       SUM("scheduled_payment".amount) FILTER (WHERE "scheduled_payment".due_date >= %%s),
+                       SUM("scheduled_payment".amount) FILTER (WHERE "scheduled_payment".due_date < %%s)
+                  FROM %s
+                 WHERE %s
+                 GROUP BY "scheduled_payment".renter_id, "scheduled_payment".currency_id
+            """ % (from_clause, where_clause), [fields.Date.today(), fields.Date.today()] + where_params)
+            rows = self.env.cr.fetchall()
+            currencies = self.env['res.currency'].browse({row[1] for row in rows})
+            for renter_id, currency_id, upcoming, overdue in rows:
+                currency = currencies.browse(currency_id)
+                renter_totals = totals.setdefault(renter_id, ({}, {}))
+                if upcoming:
+                    renter_totals[0][currency] = upcoming
+                if overdue:
+                    renter_totals[1][currency] = overdue
+        return totals
+
+    def _compute_payment_summary(self):
+        """
+        Compute the upcoming and overdue payment totals per currency for display
+        """
+        totals = self._get_outstanding_payment_totals()
+        for record in self:
+            upcoming, overdue = totals.get(record._origin.id, ({}, {}))
+            record.upcoming_payment_summary = ', '.join(
+                tools.format_amount(self.env, amount, currency) for currency, amount in upcoming.items()
+            )
+            record.overdue_payment_summary = ', '.join(
+                tools.format_amount(self.env, amount, currency) for currency, amount in overdue.items()
+            )
 
     def action_view_invitations(self):
         """
@@ -120,17 +327,90 @@ class BuildingRenter(models.Model):
     def check_due_payments(self):
         """
         Cron method to check for due payments and send notifications
+
+        Due payments are processed in chunks of j_reception.payment_batch_size.
+        The reminders of a chunk are rendered together and queued in mail.mail,
+        and the payments are flagged as notified in the same transaction, which
+        is committed before the next chunk. A payment is therefore notified at
+        most once, even when a run is interrupted and restarted.
+
+        Every payment keeps the outcome of its notification: the queued email
+        and a state updated by the mail queue once it is sent or has failed.
+        A payment whose reminder cannot be rendered is marked as failed with
+        the error and skipped by later runs.
+        Returns the number of payments notified.
         """
-        today = fields.Date.today()
-        due_payments = self.env['scheduled.payment'].search([
-            ('due_date', '<=', today),
-            ('is_notified', '=', False)
-        ])
-        
-        for payment in due_payments:
-            # Send notification email
-            template = self.env.ref('j_reception.email_template_payment_due')
-            if template:
-                template.send_mail(payment.id, force_send=True)
-            # Mark as notified
-            payment.is_notified = True
\ No newline at end of file
+        template = self.env.ref('j_reception.email_template_payment_due', raise_if_not_found=False)
+        if not template:
+            return 0
+
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        params = self.env['ir.config_parameter'].sudo()
+        batch_size = int(params.get_param('j_reception.payment_batch_size', 200))
+        Payment = self.env['scheduled.payment']
+
+        domain = [
+            ('due_date', '<=', fields.Date.today()),
+            ('is_notified', '=', False),
+            ('is_paid', '=', False),
+            ('notification_state', '!=', 'failed'),
+        ]
+        processed = 0
+        while True:
+            due_payments = Payment.search(domain, order='due_date, id', limit=batch_size)
+            if not due_payments:
+                break
+
+            mails, errors = self._queue_payment_reminders(template, due_payments)
+            mail_ids = {mail.res_id: mail.id for mail in mails}
+            self.env['scheduled.payment'].flush()
+            self.env.cr.execute("""
+                UPDATE scheduled_payment AS payment
+                   SET is_notified = outcome.error IS NULL,
+                       notification_date = %s,
+                       notification_mail_id = outcome.mail_id,
+                       notification_state = CASE WHEN outcome.error IS NULL THEN 'queued' ELSE 'failed' END,
+                       notification_error = outcome.error
+                  FROM unnest(%s::int[], %s::int[], %s::text[]) AS outcome(id, mail_id, error)
+                 WHERE payment.id = outcome.id
+            """, (
+                fields.Datetime.now(),
+                due_payments.ids,
+                [mail_ids.get(payment_id) for payment_id in due_payments.ids],
+                [errors.get(payment_id) for payment_id in due_payments.ids],
+            ))
+            processed += len(mails)
+            if auto_commit:
+                self.env.cr.commit()
+            Payment.invalidate_cache()
+
+        if processed:
+            self.env['mail.mail']._trigger_reception_mail_queue()
+        _logger.info("Reception: queued %s due payment notifications", processed)
+        return processed
+
+    @api.model
+    def _queue_payment_reminders(self, template, payments):
+        """
+        Queue the reminders of the given payments, isolating rendering failures
+
+        The chunk is rendered in one batch; when that fails, the payments are
+        rendered one by one so that only the faulty ones are left out.
+        Returns (mails, {payment id: error message}).
+        """
+        try:
+            with self.env.cr.savepoint():
+                return template._send_mail_batch(payments.ids), {}
+        except Exception:
+            _logger.warning("Reception: batch rendering of due payment reminders failed, retrying one by one")
+
+        mails = self.env['mail.mail']
+        errors = {}
+        for payment in payments:
+            try:
+                with self.env.cr.savepoint():
+                    mails |= template._send_mail_batch(payment.ids)
+            except Exception as error:
+                _logger.warning("Reception: could not render the reminder of payment %s: %s", payment.id, error)
+                errors[payment.id] = str(error)
+        return mails, errors
@@ -3,7 +3,9 @@
 Facilities model for managing building facilities
 """
 
-from odoo import models, fields
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from datetime import timedelta
 
 
 class Facilities(models.Model):
@@ -21,4 +23,70 @@ class Facilities(models.Model):
         placeholder='e.g., Conference Room, Gym, Pool',
         help='Name of the facility',
         tracking=True
-    )
\ No newline at end of file
+    )
+
+    @api.model
+    def get_free_slots(self, date_from, date_to, duration_id, facility_ids=None):
+        """
+        Return the free intervals of facilities between two dates
+
+        The active bookings overlapping the range are read with a single query,
+        sorted by facility and start, and merged with a sweep line; the gaps
+        that are at least as long as the duration are returned. The range is
+        clipped to the current time, as intervals that already started cannot
+        be booked anymore.
+
+        :param date_from: start of the range (UTC datetime or string)
+        :param date_to: end of the range (UTC datetime or string)
+        :param duration_id: id of the minimum duration of a free interval
+        :param facility_ids: ids of the facilities to check, all facilities when empty
+        :return: list of dicts with facility_id, facility_name and free_slots,
+                 each free slot being a dict with UTC start and end strings
+        """
+        date_from = fields.Datetime.to_datetime(date_from)
+        date_to = fields.Datetime.to_datetime(date_to)
+        if not date_from or not date_to or date_from >= date_to:
+            raise UserError(_("The end of the availability range must be after its start."))
+
+        duration = self.env['duration'].browse(duration_id).exists()
+        if not duration or duration.minutes <= 0:
+            raise UserError(_("Please select a valid booking duration."))
+        min_length = timedelta(minutes=duration.minutes)
+        date_from = max(date_from, fields.Datetime.now())
+        facilities = self.search([('id', 'in', facility_ids)] if facility_ids else [])
+        if not facilities:
+            return []
+
+        self.env['booking'].flush(['facility_id', 'booking_datetime', 'booking_end', 'active'])
+        self.env.cr.execute("""
+            SELECT facility_id, booking_datetime, booking_end
+              FROM booking
+             WHERE facility_id = ANY(%s)
+               AND booking_datetime < %s
+               AND booking_end > %s
+               AND active
+             ORDER BY facility_id, booking_datetime
+        """, (facilities.ids, date_to, date_from))
+        bookings_by_facility = {}
+        for facility_id, start, end in self.env.cr.fetchall():
+            bookings_by_facility.setdefault(facility_id, []).append((start, end))
+
+        result = []
+        for facility in facilities:
+            free_slots = []
+            cursor = date_from
+            for start, end in bookings_by_facility.get(facility.id, []):
+                if start - cursor >= min_length:
+                    free_slots.append((cursor, start))
+                cursor = max(cursor, end)
+            if date_to - cursor >= min_length:
+                free_slots.append((cursor, date_to))
+            result.append({
+                'facility_id': facility.id,
+                'facility_name': facility.name,
+                'free_slots': [{
+                    'start': fields.Datetime.to_string(start),
+                    'end': fields.Datetime.to_string(end),
+                } for start, end in free_slots],
+            })
+        return result
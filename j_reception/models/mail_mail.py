@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Mail queue extension for sending reception emails in the background
+"""
+
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+# Models whose emails are flushed by the reception mail queue
+RECEPTION_MAIL_MODELS = ['reception.invitation', 'scheduled.payment']
+# Number of times a failed email is put back in the queue
+MAIL_MAX_RETRIES = 5
+# Delay before the first retry, doubled for every further attempt
+MAIL_RETRY_DELAY_MINUTES = 5
+
+
+class MailMail(models.Model):
+    """
+    Add retry tracking to outgoing emails for the reception mail queue
+    """
+    _inherit = 'mail.mail'
+
+    reception_retry_count = fields.Integer(
+        string='Reception Retries',
+        default=0,
+        copy=False,
+        help='Number of times the reception mail queue put this email back in the queue after a failure'
+    )
+
+    @api.model
+    def _trigger_reception_mail_queue(self):
+        """
+        Ask the reception mail queue to run as soon as possible
+        """
+        cron = self.env.ref('j_reception.ir_cron_reception_mail_queue', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _process_reception_mail_queue(self):
+        """
+        Cron method sending queued reception emails in batches
+
+        Failed emails are put back in the queue with an exponential backoff,
+        until MAIL_MAX_RETRIES attempts have been made.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        params = self.env['ir.config_parameter'].sudo()
+        batch_size = int(params.get_param('j_reception.mail_batch_size', 50))
+        now = fields.Datetime.now()
+
+        # Put failed emails back in the queue, each one after its own backoff delay
+        failed_mails = self.sudo().search([
+            ('model', 'in', RECEPTION_MAIL_MODELS),
+            ('state', '=', 'exception'),
+            ('reception_retry_count', '<', MAIL_MAX_RETRIES),
+        ])
+        for mail in failed_mails:
+            delay = MAIL_RETRY_DELAY_MINUTES * 2 ** mail.reception_retry_count
+            mail.write({
+                'state': 'outgoing',
+                'reception_retry_count': mail.reception_retry_count + 1,
+                'scheduled_date': fields.Datetime.to_string(now + timedelta(minutes=delay)),
+            })
+        if failed_mails and auto_commit:
+            self.env.cr.commit()
+
+        # Send one batch of due emails
+        domain = [
+            ('model', 'in', RECEPTION_MAIL_MODELS),
+            ('state', '=', 'outgoing'),
+            '|', ('scheduled_date', '=', False), ('scheduled_date', '<=', fields.Datetime.to_string(now)),
+        ]
+        mails = self.sudo().search(domain, limit=batch_size)
+        if not mails:
+            return
+        mails.send(auto_commit=auto_commit)
+        _logger.info("Reception mail queue: processed %s emails", len(mails))
+
+        # Run again right away while due emails remain
+        if self.sudo().search_count(domain):
+            self._trigger_reception_mail_queue()
+
+    def _postprocess_sent_message(self, success_pids, failure_reason=False, failure_type=None):
+        """
+        Override to report the delivery of due payment reminders on their payments
+
+        A failure is only final once the reception mail queue stopped retrying
+        the email.
+        """
+        payment_mails = self.filtered(lambda mail: mail.model == 'scheduled.payment')
+        if payment_mails:
+            Payment = self.env['scheduled.payment'].sudo()
+            if failure_type:
+                failed_mails = payment_mails.filtered(lambda mail: mail.reception_retry_count >= MAIL_MAX_RETRIES)
+                if failed_mails:
+                    Payment.search([('notification_mail_id', 'in', failed_mails.ids)]).write({
+                        'notification_state': 'failed',
+                        'notification_error': failure_reason or failure_type,
+                    })
+            else:
+                Payment.search([('notification_mail_id', 'in', payment_mails.ids)]).write({
+                    'notification_state': 'sent',
+                    'notification_error': False,
+                })
+        return super(MailMail, self)._postprocess_sent_message(
+            success_pids, failure_reason=failure_reason, failure_type=failure_type
+        )
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Mail template extension for rendering reception emails in batches
+"""
+
+from odoo import models, Command
+
+
+class MailTemplate(models.Model):
+    """
+    Add a batch counterpart of send_mail to email templates
+    """
+    _inherit = 'mail.template'
+
+    def _send_mail_batch(self, res_ids, force_send=False):
+        """
+        Render the template once for all given records and create their emails together
+
+        Batch counterpart of send_mail: every template field is rendered for all
+        res_ids in one pass and the emails are created with a single create call.
+        Returns the created mail.mail records.
+        """
+        self.ensure_one()
+        if not res_ids:
+            return self.env['mail.mail']
+
+        values_by_res_id = self.generate_email(
+            list(res_ids),
+            ['subject', 'body_html', 'email_from', 'email_to', 'partner_to', 'email_cc', 'reply_to', 'scheduled_date']
+        )
+
+        vals_list = []
+        report_attachments = []
+        for res_id in res_ids:
+            values = values_by_res_id[res_id]
+            values['recipient_ids'] = [Command.link(pid) for pid in values.get('partner_ids', [])]
+            values['attachment_ids'] = [Command.link(aid) for aid in values.get('attachment_ids', [])]
+            report_attachments.append(values.pop('attachments', []))
+            # add a protection against void email_from
+            if 'email_from' in values and not values.get('email_from'):
+                values.pop('email_from')
+            vals_list.append(values)
+
+        mails = self.env['mail.mail'].sudo().create(vals_list)
+
+        # Link the rendered reports to the messages, as send_mail does
+        Attachment = self.env['ir.attachment'].sudo()
+        for mail, attachments in zip(mails, report_attachments):
+            if attachments:
+                mail.write({'attachment_ids': [Command.link(Attachment.create({
+                    'name': name,
+                    'datas': content,
+                    'type': 'binary',
+                    'res_model': 'mail.message',
+                    'res_id': mail.mail_message_id.id,
+                }).id) for name, content in attachments]})
+
+        if force_send:
+            mails.send()
+        return mails
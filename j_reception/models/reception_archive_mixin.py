@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Reception archive mixin for moving historical records out of the working set
+"""
+
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+
+class ReceptionArchiveMixin(models.AbstractModel):
+    """
+    Mixin archiving the records older than the history retention window
+
+    Archived records are hidden from the working views and skipped by the
+    partial indexes of the inheriting models; they stay readable from the
+    History menu.
+    """
+    _name = 'reception.archive.mixin'
+    _description = 'Reception Archive Mixin'
+
+    active = fields.Boolean(
+        string='Active',
+        default=True,
+        help='Archived records are kept as read-only history'
+    )
+
+    @api.model
+    def _get_reception_archive_domain(self, cutoff):
+        """
+        Return the domain of the active records to archive
+
+        :param cutoff: UTC datetime before which the records are considered history
+        """
+        return [('id', '=', False)]
+
+    @api.model
+    def archive_reception_history(self):
+        """
+        Cron method to archive the records older than the retention window
+
+        Records matching the archive domain for a cutoff of
+        j_reception.history_retention_days days ago are archived in chunks of
+        j_reception.archive_batch_size records, committing after each chunk.
+        Returns the number of records archived.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        params = self.env['ir.config_parameter'].sudo()
+        retention_days = int(params.get_param('j_reception.history_retention_days', 30))
+        batch_size = int(params.get_param('j_reception.archive_batch_size', 1000))
+        if retention_days <= 0:
+            return 0
+
+        domain = self._get_reception_archive_domain(fields.Datetime.now() - timedelta(days=retention_days))
+        archived = 0
+        while True:
+            records = self.search(domain, limit=batch_size)
+            if not records:
+                break
+
+            records.with_context(mail_notrack=True).write({'active': False})
+            archived += len(records)
+            if auto_commit:
+                self.env.cr.commit()
+            self.invalidate_cache()
+
+        _logger.info("Reception: archived %s %s records", archived, self._name)
+        return archived
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Guest directory model for suggesting the recent guests of each renter
+"""
+
+from odoo import models, fields, api, tools
+import logging
+import psycopg2
+
+_logger = logging.getLogger(__name__)
+
+# Expression indexed with pg_trgm and matched by the guest search; both must stay identical
+GUEST_SEARCH_EXPRESSION = "(COALESCE(name, '') || ' ' || COALESCE(email, '') || ' ' || COALESCE(phone, ''))"
+
+
+class ReceptionGuest(models.Model):
+    """
+    Directory of the guests invited by each renter
+
+    One line per renter and guest partner, maintained when invitations are
+    created or change guest, and used to rank the guest suggestions.
+    """
+    _name = 'reception.guest'
+    _description = 'Reception Guest'
+    _order = 'last_invited desc, id desc'
+
+    renter_id = fields.Many2one(
+        'building.renter',
+        string='Renter',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        help='The renter who invited this guest'
+    )
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Guest',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        help='The guest partner'
+    )
+    name = fields.Char(
+        string='Name',
+        readonly=True,
+        help='Name of the guest'
+    )
+    email = fields.Char(
+        string='Email',
+        readonly=True,
+        help='Email of the guest'
+    )
+    phone = fields.Char(
+        string='Phone',
+        readonly=True,
+        help='Phone of the guest'
+    )
+    last_invited = fields.Datetime(
+        string='Last Invited',
+        readonly=True,
+        help='When the renter last invited this guest'
+    )
+    invite_count = fields.Integer(
+        string='Invitations',
+        readonly=True,
+        help='Number of invitations the renter sent to this guest'
+    )
+
+    _sql_constraints = [
+        ('renter_partner_unique', 'unique(renter_id, partner_id)', 'A guest can only appear once per renter.'),
+    ]
+
+    def _auto_init(self):
+        """
+        Make sure pg_trgm is available before the guest search index is created
+        """
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except psycopg2.Error:
+            _logger.warning(
+                "Could not enable the pg_trgm extension, guest suggestions "
+                "will be searched without a trigram index."
+            )
+        return super(ReceptionGuest, self)._auto_init()
+
+    def init(self):
+        """
+        Indexes used by the guest suggestions, and the directory of existing invitations
+        """
+        tools.create_index(
+            self._cr, 'reception_guest_renter_last_invited_idx', self._table,
+            ['renter_id', 'last_invited DESC']
+        )
+        if not tools.index_exists(self._cr, 'reception_guest_search_trgm_idx'):
+            try:
+                with self.env.cr.savepoint():
+                    self._cr.execute("""
+                        CREATE INDEX reception_guest_search_trgm_idx
+                            ON reception_guest USING gin (%s gin_trgm_ops)
+                    """ % GUEST_SEARCH_EXPRESSION)
+            except psycopg2.Error:
+                _logger.warning("Could not create the guest search trigram index.")
+
+        self._cr.execute("SELECT 1 FROM reception_guest LIMIT 1")
+        if not self._cr.fetchone():
+            self._cr.execute("""
+                INSERT INTO reception_guest (renter_id, partner_id, name, email, phone,
+                                             last_invited, invite_count,
+                                             create_uid, create_date, write_uid, write_date)
+                SELECT invitation.renter_id, invitation.guest_partner_id,
+                       partner.name, partner.email, partner.phone,
+                       MAX(invitation.create_date), COUNT(*),
+                       1, now() AT TIME ZONE 'UTC', 1, now() AT TIME ZONE 'UTC'
+                  FROM reception_invitation invitation
+                  JOIN res_partner partner ON partner.id = invitation.guest_partner_id
+                 WHERE invitation.renter_id IS NOT NULL
+                 GROUP BY invitation.renter_id, invitation.guest_partner_id,
+                          partner.name, partner.email, partner.phone
+                ON CONFLICT (renter_id, partner_id) DO NOTHING
+            """)
+
+    @api.model
+    def _register_invitations(self, invitations):
+        """
+        Add the guests of the given invitations to the directory of their renter
+
+        All pairs are upserted with a single query: new guests are inserted,
+        known ones get their last invitation date and counter updated.
+        """
+        counts = {}
+        for invitation in invitations:
+            if invitation.renter_id and invitation.guest_partner_id:
+                key = (invitation.renter_id.id, invitation.guest_partner_id)
+                counts[key] = counts.get(key, 0) + 1
+        if not counts:
+            return
+
+        keys = list(counts)
+        self.flush()
+        self.env.cr.execute("""
+            INSERT INTO reception_guest (renter_id, partner_id, name, email, phone,
+                                         last_invited, invite_count,
+                                         create_uid, create_date, write_uid, write_date)
+            SELECT guest.renter_id, guest.partner_id, guest.name, guest.email, guest.phone,
+                   %s, guest.invite_count,
+                   %s, now() AT TIME ZONE 'UTC', %s, now() AT TIME ZONE 'UTC'
+              FROM unnest(%s::int[], %s::int[], %s::varchar[], %s::varchar[], %s::varchar[], %s::int[])
+                   AS guest(renter_id, partner_id, name, email, phone, invite_count)
+            ON CONFLICT (renter_id, partner_id) DO UPDATE
+               SET name = EXCLUDED.name,
+                   email = EXCLUDED.email,
+                   phone = EXCLUDED.phone,
+                   last_invited = EXCLUDED.last_invited,
+                   invite_count = reception_guest.invite_count + EXCLUDED.invite_count,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, (
+            fields.Datetime.now(), self.env.uid, self.env.uid,
+            [renter_id for renter_id, partner in keys],
+            [partner.id for renter_id, partner in keys],
+            [partner.name or None for renter_id, partner in keys],
+            [partner.email or None for renter_id, partner in keys],
+            [partner.phone or None for renter_id, partner in keys],
+            [counts[key] for key in keys],
+        ))
+        self.invalidate_cache()
+
+    @api.model
+    def _rebuild_guests(self, pairs):
+        """
+        Rebuild the directory lines of the given (renter id, partner id) pairs from the invitations
+
+        Used when invitations move to another renter: the lines are deleted and
+        inserted again from the current invitations, so that no renter keeps
+        the guests of invitations it lost.
+        """
+        pairs = [(renter_id, partner_id) for renter_id, partner_id in pairs if renter_id and partner_id]
+        if not pairs:
+            return
+        self.flush()
+        self.env['reception.invitation'].flush(['renter_id', 'guest_partner_id'])
+        renter_ids = [renter_id for renter_id, partner_id in pairs]
+        partner_ids = [partner_id for renter_id, partner_id in pairs]
+        self.env.cr.execute("""
+            DELETE FROM reception_guest AS guest
+             USING unnest(%s::int[], %s::int[]) AS pair(renter_id, partner_id)
+             WHERE guest.renter_id = pair.renter_id
+               AND guest.partner_id = pair.partner_id
+        """, (renter_ids, partner_ids))
+        self.env.cr.execute("""
+            INSERT INTO reception_guest (renter_id, partner_id, name, email, phone,
+                                         last_invited, invite_count,
+                                         create_uid, create_date, write_uid, write_date)
+            SELECT invitation.renter_id, invitation.guest_partner_id,
+                   partner.name, partner.email, partner.phone,
+                   MAX(invitation.create_date), COUNT(*),
+                   %s, now() AT TIME ZONE 'UTC', %s, now() AT TIME ZONE 'UTC'
+              FROM reception_invitation invitation
+              JOIN unnest(%s::int[], %s::int[]) AS pair(renter_id, partner_id)
+                ON pair.renter_id = invitation.renter_id
+               AND pair.partner_id = invitation.guest_partner_id
+              JOIN res_partner partner ON partner.id = invitation.guest_partner_id
+             GROUP BY invitation.renter_id, invitation.guest_partner_id,
+                      partner.name, partner.email, partner.phone
+        """, (self.env.uid, self.env.uid, renter_ids, partner_ids))
+        self.invalidate_cache()
+
+    @api.model
+    def _sync_partners(self, partners):
+        """
+        Copy the name, email and phone of the given partners to their directory lines
+        """
+        if not partners:
+            return
+        self.flush()
+        self.env.cr.execute("""
+            UPDATE reception_guest AS guest
+               SET name = partner.name,
+                   email = partner.email,
+                   phone = partner.phone
+              FROM unnest(%s::int[], %s::varchar[], %s::varchar[], %s::varchar[])
+                   AS partner(id, name, email, phone)
+             WHERE guest.partner_id = partner.id
+        """, (
+            partners.ids,
+            [partner.name or None for partner in partners],
+            [partner.email or None for partner in partners],
+            [partner.phone or None for partner in partners],
+        ))
+        self.invalidate_cache(['name', 'email', 'phone'])
+
+    @api.model
+    def _search_guest_partners(self, renter_id, name, limit=8):
+        """
+        Return the ids of the renter's guests matching name, most recently invited first
+
+        The match runs on the pg_trgm indexed name/email/phone expression; the
+        LIKE wildcards typed by the user are matched literally.
+        """
+        pattern = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        self.flush(['renter_id', 'partner_id', 'name', 'email', 'phone', 'last_invited', 'invite_count'])
+        self.env.cr.execute("""
+            SELECT partner_id
+              FROM reception_guest
+             WHERE renter_id = %%s
+               AND %s ILIKE %%s
+             ORDER BY last_invited DESC NULLS LAST, invite_count DESC, id DESC
+             LIMIT %%s
+        """ % GUEST_SEARCH_EXPRESSION, (renter_id, '%%%s%%' % pattern, limit))
+        return [row[0] for row in self.env.cr.fetchall()]
@@ -3,10 +3,18 @@
 Reception Invitation model for managing building invitations
 """
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
+from odoo.tools import consteq
+from odoo.tools.misc import hmac
 from datetime import datetime
+import logging
 import re
+import secrets
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
 
 
 class ReceptionInvitation(models.Model):
@@ -15,7 +23,7 @@ class ReceptionInvitation(models.Model):
     """
     _name = 'reception.invitation'
     _description = 'Reception Invitation'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'reception.tracking.mixin', 'reception.archive.mixin', 'reception.role.mixin']
     _order = 'sequence desc'
 
     sequence = fields.Char(
@@ -31,7 +39,7 @@ class ReceptionInvitation(models.Model):
         string='Officer',
         required=True,
         default=lambda self: self.env.user,
-        domain=lambda self: [('id', 'in', self.env['building.renter'].search([]).mapped('officer_id.id'))],
+        domain=lambda self: [('id', 'in', list(self.env['building.renter']._get_officer_renter_map()))],
         placeholder='Select the officer',
         help='The user responsible for this invitation',
         tracking=True
@@ -42,6 +50,9 @@ class ReceptionInvitation(models.Model):
         required=True,
         readonly=True,
         compute='_compute_renter_id',
+        store=True,
+        index=True,
+        ondelete='restrict',
         help='The renter associated with this invitation',
         tracking=True
     )
@@ -85,6 +96,21 @@ class ReceptionInvitation(models.Model):
         compute='_compute_officer_readonly',
         help='Control whether officer field is readonly based on user permissions'
     )
+    checkin_token = fields.Char(
+        string='Check-in Token',
+        readonly=True,
+        copy=False,
+        help='Random token identifying the invitation at the reception desk'
+    )
+    checkin_code = fields.Char(
+        string='Check-in Code',
+        compute='_compute_checkin_code',
+        help='Signed check-in token printed as a QR code in the invitation email'
+    )
+
+    _sql_constraints = [
+        ('checkin_token_unique', 'unique(checkin_token)', 'The check-in token must be unique.'),
+    ]
 
     @api.depends('sequence', 'guest_partner_id', 'renter_id')
     def _compute_name(self):
@@ -104,35 +130,31 @@ class ReceptionInvitation(models.Model):
         """
         Auto-populate renter when officer changes
         """
+        officer_renter_map = self.env['building.renter']._get_officer_renter_map()
         for rec in self:
-            if rec.officer_id:
-                renter = self.env['building.renter'].search([
-                    ('officer_id', '=', rec.officer_id.id)
-                ], limit=1)
-                if renter:
-                    rec.renter_id = renter.id
-                else:
-                    rec.renter_id = False
+            # Renter is cleared when no officer is selected or the officer has no renter
+            rec.renter_id = officer_renter_map.get(rec.officer_id.id, False)
+
+    @api.depends('checkin_token')
+    def _compute_checkin_code(self):
+        """
+        Compute the signed check-in code from the check-in token
+        """
+        for record in self:
+            if record.checkin_token:
+                record.checkin_code = '%s.%s' % (record.checkin_token, self._sign_checkin_token(record.checkin_token))
             else:
-                # If no officer selected, clear renter field
-                rec.renter_id = False
+                record.checkin_code = False
 
     @api.depends('officer_id')
     def _compute_officer_readonly(self):
         """
         Control whether officer field is readonly based on user permissions
         """
+        # Only admins can edit the officer field
+        officer_readonly = self._get_reception_role() != 'admin'
         for record in self:
-            # Check if user has admin group
-            if self.env.user.has_group('j_reception.group_j_reception_admin'):
-                # Admins can always edit officer field
-                record.officer_readonly = False
-            elif self.env.user.has_group('j_reception.group_j_reception_renter'):
-                # Tenants cannot edit officer field (readonly)
-                record.officer_readonly = True
-            else:
-                # Other users cannot edit officer field
-                record.officer_readonly = True
+            record.officer_readonly = officer_readonly
 
     @api.model
     def default_get(self, fields_list):
@@ -141,10 +163,7 @@ class ReceptionInvitation(models.Model):
         """
         res = super(ReceptionInvitation, self).default_get(fields_list)
         if 'renter_id' in fields_list:
-            current_user = self.env.user
-            renter = self.env['building.renter'].search([
-                ('officer_id', '=', current_user.id)
-            ], limit=1)
+            renter = self.env['building.renter']._get_renter_for_officer(self.env.uid)
             if renter:
                 res['renter_id'] = renter.id
         return res
@@ -155,85 +174,179 @@ class ReceptionInvitation(models.Model):
         Ensure officer can only create invitations for their assigned renter
         (except for Reception Administrators who can create for any renter)
         """
+        # Skip constraint check for Reception Administrators
+        if self._get_reception_role() == 'admin':
+            return
+
         for record in self:
             if record.officer_id and record.renter_id:
-                # Skip constraint check for Reception Administrators
-                if self.env.user.has_group('j_reception.group_j_reception_admin'):
-                    continue
-
                 if record.renter_id.officer_id.id != record.officer_id.id:
                     raise ValidationError(
                         f"You can only create invitations for renters you are assigned to. "
                         f"You are not the officer for '{record.renter_id.name}'."
                     )
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """
-        Override create to generate sequence
+        Override create to generate sequences and check-in tokens
         """
-        if vals.get('sequence', _('New')) == _('New'):
-            vals['sequence'] = self.env['ir.sequence'].next_by_code('reception.invitation') or _('New')
+        # Reserve the numbers of the whole batch in one call
+        numbered_vals = [vals for vals in vals_list if vals.get('sequence', _('New')) == _('New')]
+        sequences = self.env['ir.sequence'].next_by_code_batch('reception.invitation', len(numbered_vals))
+        for vals, sequence in zip(numbered_vals, sequences):
+            vals['sequence'] = sequence or _('New')
+        for vals in vals_list:
+            if not vals.get('checkin_token'):
+                vals['checkin_token'] = self._generate_checkin_token()
 
-        invitation = super(ReceptionInvitation, self).create(vals)
+        invitations = super(ReceptionInvitation, self).create(vals_list)
+        self.env['reception.guest'].sudo()._register_invitations(invitations)
 
-        return invitation
+        return invitations
 
     def write(self, vals):
         """
         Override write to handle datetime changes and state changes
         """
-        datetime_changed = False
-        state_changed = False
+        datetime_changed = self.browse()
+        state_changed = self.browse()
 
-        for record in self:
-            if 'invitation_datetime' in vals and vals['invitation_datetime'] != record.invitation_datetime:
-                datetime_changed = True
-            if 'state' in vals and vals['state'] != record.state:
-                state_changed = True
+        if 'invitation_datetime' in vals:
+            new_datetime = fields.Datetime.to_datetime(vals['invitation_datetime'])
+            datetime_changed = self.filtered(lambda record: record.invitation_datetime != new_datetime)
+        if 'state' in vals:
+            state_changed = self.filtered(lambda record: record.state != vals['state'])
 
         result = super(ReceptionInvitation, self).write(vals)
 
+        # Add the new guest to the directory of the renter
+        if 'guest_partner_id' in vals:
+            self.env['reception.guest'].sudo()._register_invitations(self)
+
         # Send datetime change notification
         if datetime_changed:
-            for record in self:
-                record._send_datetime_change_email()
+            datetime_changed._send_datetime_change_email()
 
         # Send initial invitation email when state changes to scheduled
         if state_changed and vals.get('state') == 'scheduled':
-            for record in self:
-                record._send_invitation_email()
+            state_changed._send_invitation_email()
 
         # Send attendance notification
         if state_changed and vals.get('state') == 'attended':
-            for record in self:
-                record._send_attendance_notification()
+            state_changed._send_attendance_notification()
 
         return result
 
+    def _use_async_email(self):
+        """
+        Return whether invitation emails are queued instead of sent right away
+        """
+        return bool(self.env['ir.config_parameter'].sudo().get_param('j_reception.async_email'))
+
+    def _get_email_render_context(self):
+        """
+        Return the settings used by the invitation email templates, read once per batch
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        return {
+            'reception_building_image_url': self.env['res.config.settings']._get_j_reception_building_image_url(),
+            'reception_location_url': params.get_param('j_reception.location_url') or '',
+        }
+
+    def _send_template_email(self, template_xmlid):
+        """
+        Send the given email template to all invitations in one batch
+
+        The template is rendered once for the whole recordset. In asynchronous
+        mode the emails are only queued, and the reception mail queue is
+        triggered to send them in batches.
+        """
+        template = self.env.ref(template_xmlid, raise_if_not_found=False)
+        if not template or not self:
+            return
+        async_email = self._use_async_email()
+        template.with_context(**self._get_email_render_context())._send_mail_batch(
+            self.ids, force_send=not async_email
+        )
+        if async_email:
+            self.env['mail.mail']._trigger_reception_mail_queue()
+
     def _send_invitation_email(self):
         """
         Send initial invitation email to guest
         """
-        template = self.env.ref('j_reception.email_template_new_invitation', raise_if_not_found=False)
-        if template:
-            template.send_mail(self.id, force_send=True)
+        self._send_template_email('j_reception.email_template_new_invitation')
 
     def _send_datetime_change_email(self):
         """
         Send email notification when invitation datetime changes
         """
-        template = self.env.ref('j_reception.email_template_datetime_change', raise_if_not_found=False)
-        if template:
-            template.send_mail(self.id, force_send=True)
+        self._send_template_email('j_reception.email_template_datetime_change')
 
     def _send_attendance_notification(self):
         """
         Send notification to responsible user when guest attends
         """
-        template = self.env.ref('j_reception.email_template_attendance_notification', raise_if_not_found=False)
-        if template:
-            template.send_mail(self.id, force_send=True)
+        self._send_template_email('j_reception.email_template_attendance_notification')
+
+    @api.model
+    def _generate_checkin_token(self):
+        """
+        Return a new random check-in token
+        """
+        return secrets.token_urlsafe(9)
+
+    @api.model
+    def _sign_checkin_token(self, token):
+        """
+        Return the signature of a check-in token, derived from the database secret
+        """
+        return hmac(self.env(su=True), 'j_reception.checkin', token)[:16]
+
+    @api.model
+    def _checkin_by_code(self, code):
+        """
+        Mark the invitation of a scanned check-in code as attended
+
+        Forged codes are rejected from their signature without any query. Valid
+        ones are looked up through the unique index on the token, checked
+        against the write access of the user, then locked, so concurrent scans
+        of the same code check in the guest only once. Nothing about the
+        invitation is returned to a user who cannot write it.
+
+        :return: dict with a status ('attended', 'already_attended', 'not_allowed'
+                 or 'invalid') and, for a known invitation, its id, number, guest
+                 and state
+        """
+        token, dummy, signature = (code or '').strip().partition('.')
+        if not token or not signature or not consteq(signature, self._sign_checkin_token(token)):
+            return {'status': 'invalid'}
+
+        self.env.cr.execute("SELECT id FROM reception_invitation WHERE checkin_token = %s", (token,))
+        row = self.env.cr.fetchone()
+        if not row:
+            return {'status': 'invalid'}
+
+        invitation = self.browse(row[0])
+        invitation.check_access_rights('write')
+        invitation.check_access_rule('write')
+        self.env.cr.execute("SELECT id FROM reception_invitation WHERE id = %s FOR UPDATE", (invitation.id,))
+        invitation.invalidate_cache(['state'])
+        if invitation.state == 'attended':
+            status = 'already_attended'
+        elif invitation.state in ('scheduled', 'overdue'):
+            invitation.action_mark_attended()
+            status = 'attended'
+        else:
+            status = 'not_allowed'
+        return {
+            'status': status,
+            'invitation_id': invitation.id,
+            'sequence': invitation.sequence,
+            'guest': invitation.guest_partner_id.name,
+            'state': invitation.state,
+        }
 
     def action_confirm(self):
         """
@@ -265,15 +378,92 @@ class ReceptionInvitation(models.Model):
                 if record.invitation_datetime <= fields.Datetime.now():
                     raise ValidationError('Invitation date and time must be in the future.')
 
+    @api.model
+    def _get_reception_archive_domain(self, cutoff):
+        """
+        Closed invitations older than the cutoff are archived
+        """
+        return [
+            ('state', 'in', ['attended', 'overdue', 'cancelled']),
+            ('invitation_datetime', '<', cutoff)
+        ]
+
+    @api.model
+    def _get_reception_chatter_retention_domain(self, cutoff):
+        """
+        Closed invitations can have their chatter compacted
+        """
+        return [
+            ('state', 'in', ['attended', 'overdue', 'cancelled']),
+            ('invitation_datetime', '<', cutoff)
+        ]
+
+    def init(self):
+        """
+        Indexes used by the overdue invitations cron and the working views, and check-in tokens for existing invitations
+        """
+        tools.create_index(
+            self._cr, 'reception_invitation_state_datetime_idx', self._table,
+            ['state', 'invitation_datetime']
+        )
+        if not tools.index_exists(self._cr, 'reception_invitation_active_sequence_idx'):
+            # Default kanban and list ordering, on the working set only
+            self._cr.execute("""
+                CREATE INDEX reception_invitation_active_sequence_idx
+                    ON reception_invitation (sequence DESC)
+                 WHERE active
+            """)
+        self._cr.execute("SELECT id FROM reception_invitation WHERE checkin_token IS NULL")
+        invitation_ids = [row[0] for row in self._cr.fetchall()]
+        if invitation_ids:
+            self._cr.execute("""
+                UPDATE reception_invitation AS invitation
+                   SET checkin_token = token.value
+                  FROM unnest(%s::int[], %s::varchar[]) AS token(id, value)
+                 WHERE invitation.id = token.id
+            """, (invitation_ids, [self._generate_checkin_token() for dummy in invitation_ids]))
+
     @api.model
     def check_overdue_invitations(self):
         """
         Cron method to check for overdue invitations
+
+        Invitations are marked overdue in chunks of j_reception.overdue_batch_size
+        records, committing after each chunk. When the time budget
+        (j_reception.overdue_time_budget, in seconds) is spent, the cron is
+        triggered again and resumes with the remaining invitations.
+        Returns the number of invitations marked as overdue.
         """
-        now = fields.Datetime.now()
-        overdue_invitations = self.search([
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        params = self.env['ir.config_parameter'].sudo()
+        batch_size = int(params.get_param('j_reception.overdue_batch_size', 500))
+        time_budget = int(params.get_param('j_reception.overdue_time_budget', 120))
+        started = time.monotonic()
+
+        domain = [
             ('state', '=', 'scheduled'),
-            ('invitation_datetime', '<', now)
-        ])
+            ('invitation_datetime', '<', fields.Datetime.now())
+        ]
+        processed = 0
+        while True:
+            overdue_invitations = self.search(domain, order='invitation_datetime, id', limit=batch_size)
+            if not overdue_invitations:
+                break
+
+            overdue_invitations._reception_system_write(
+                {'state': 'overdue'}, _('Marked as overdue by the scheduled action.')
+            )
+            processed += len(overdue_invitations)
+            if auto_commit:
+                self.env.cr.commit()
+            self.invalidate_cache()
+
+            if time.monotonic() - started > time_budget:
+                # Resume with the remaining invitations in a new cron run
+                cron = self.env.ref('j_reception.automated_action_check_overdue_invitations', raise_if_not_found=False)
+                if cron and self.search_count(domain):
+                    cron.sudo()._trigger()
+                break
 
-        overdue_invitations.write({'state': 'overdue'})
\ No newline at end of file
+        _logger.info("Reception: marked %s invitations as overdue", processed)
+        return processed
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Reception role mixin for resolving the permissions of the current user
+"""
+
+from odoo import models, tools
+
+
+class ReceptionRoleMixin(models.AbstractModel):
+    """
+    Mixin resolving the reception role of the current user
+    """
+    _name = 'reception.role.mixin'
+    _description = 'Reception Role Mixin'
+
+    @tools.ormcache('self.env.uid')
+    def _get_reception_role(self):
+        """
+        Return the reception role of the current user: 'admin', 'tenant' or 'other'
+
+        The result is cached per user. Writing on res.groups or on the groups of
+        a user clears the registry caches, which invalidates it.
+        """
+        user = self.env.user
+        if user.has_group('j_reception.group_j_reception_admin'):
+            return 'admin'
+        if user.has_group('j_reception.group_j_reception_renter'):
+            return 'tenant'
+        return 'other'
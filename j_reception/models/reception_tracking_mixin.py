@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Reception tracking mixin for configuring the chatter tracking of high-churn models
+"""
+
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+# Tracking modes that can be configured per model
+TRACKING_MODES = [
+    ('full', 'Full'),
+    ('batched', 'Batched'),
+    ('none', 'None'),
+]
+
+
+class ReceptionTrackingMixin(models.AbstractModel):
+    """
+    Mixin making the field tracking of a model configurable
+
+    The mode is read from the j_reception.tracking_mode.<model> parameter:
+
+    * full: every tracked field change is logged with its tracking values
+    * batched: user changes are tracked, system transitions written through
+      _reception_system_write are logged as one plain note per record
+    * none: nothing is tracked
+    """
+    _name = 'reception.tracking.mixin'
+    _description = 'Reception Tracking Mixin'
+    _inherit = ['mail.thread']
+
+    @api.model
+    def _get_reception_tracking_mode(self):
+        """
+        Return the tracking mode configured for this model
+        """
+        mode = self.env['ir.config_parameter'].sudo().get_param('j_reception.tracking_mode.%s' % self._name)
+        return mode if mode in dict(TRACKING_MODES) else 'full'
+
+    def _get_tracked_fields(self):
+        """
+        Override to disable tracking when the model tracking mode is 'none'
+        """
+        if self._get_reception_tracking_mode() == 'none':
+            return set()
+        return super(ReceptionTrackingMixin, self)._get_tracked_fields()
+
+    def _reception_system_write(self, vals, note=None):
+        """
+        Write values on behalf of the system, such as a scheduled action
+
+        In batched mode the per-record tracking values are skipped and the
+        given note is logged on all records with a single batch call.
+        """
+        mode = self._get_reception_tracking_mode()
+        if mode == 'full':
+            return self.write(vals)
+        result = self.with_context(mail_notrack=True).write(vals)
+        if mode == 'batched' and note:
+            self._message_log_batch(bodies={record.id: note for record in self})
+        return result
+
+    @api.model
+    def _get_reception_chatter_retention_domain(self, cutoff):
+        """
+        Return the domain of the closed records whose chatter can be compacted
+
+        :param cutoff: UTC datetime before which the records are considered old
+        """
+        return [('id', '=', False)]
+
+    @api.model
+    def compact_reception_chatter(self):
+        """
+        Cron method to delete the old system notifications of closed records
+
+        Tracking notifications of the records matching the retention domain
+        and older than j_reception.chatter_retention_days are deleted with
+        their tracking values, for j_reception.chatter_batch_size records at a
+        time, committing after each chunk. Comments and emails are kept.
+        Returns the number of messages deleted.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        params = self.env['ir.config_parameter'].sudo()
+        retention_days = int(params.get_param('j_reception.chatter_retention_days', 180))
+        batch_size = int(params.get_param('j_reception.chatter_batch_size', 1000))
+        if retention_days <= 0:
+            return 0
+
+        cutoff = fields.Datetime.now() - timedelta(days=retention_days)
+        record_ids = self.with_context(active_test=False).search(
+            self._get_reception_chatter_retention_domain(cutoff)
+        ).ids
+        Message = self.env['mail.message'].sudo()
+        deleted = 0
+        for index in range(0, len(record_ids), batch_size):
+            messages = Message.search([
+                ('model', '=', self._name),
+                ('res_id', 'in', record_ids[index:index + batch_size]),
+                ('message_type', '=', 'notification'),
+                ('date', '<', cutoff),
+            ])
+            deleted += len(messages)
+            messages.unlink()
+            if auto_commit:
+                self.env.cr.commit()
+
+        _logger.info("Reception: deleted %s old %s notifications", deleted, self._name)
+        return deleted
@@ -3,7 +3,15 @@
 Configuration settings for J Reception module
 """
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
+from odoo.addons.base.models.res_partner import _tz_get
+import base64
+
+from ..utils import DEFAULT_TZ, get_building_tz_name
+from .reception_tracking_mixin import TRACKING_MODES
+
+# Maximum width and height of the building image embedded in emails
+BUILDING_IMAGE_EMAIL_SIZE = (800, 800)
 
 
 class ResConfigSettings(models.TransientModel):
@@ -17,9 +25,8 @@ class ResConfigSettings(models.TransientModel):
         config_parameter='j_reception.location_url',
         help='URL to the geographical location that will be included in invitation emails (e.g., Google Maps link)'
     )
-    j_reception_building_image = fields.Char(
+    j_reception_building_image = fields.Binary(
         string='Building Image',
-        config_parameter='j_reception.building_image',
         help='Image of the building that will be included in invitation emails'
     )
     j_reception_daily_booking_limit = fields.Integer(
@@ -28,6 +35,47 @@ class ResConfigSettings(models.TransientModel):
         default=0,
         help='Maximum minutes a tenant can book per day (0 = no limit)'
     )
+    j_reception_async_email = fields.Boolean(
+        string='Send Emails in Background',
+        config_parameter='j_reception.async_email',
+        help='Queue invitation emails and send them in batches from a scheduled action instead of waiting for the mail server'
+    )
+
+    j_reception_building_tz = fields.Selection(
+        _tz_get,
+        string='Building Timezone',
+        config_parameter='j_reception.building_tz',
+        default=DEFAULT_TZ,
+        help='Timezone of the building, used for booking names and the daily figures of the dashboard'
+    )
+
+    j_reception_booking_tracking_mode = fields.Selection(
+        TRACKING_MODES,
+        string='Booking Tracking',
+        config_parameter='j_reception.tracking_mode.booking',
+        default='full',
+        help='Full: log every change. Batched: log scheduled action changes as a single note. None: do not log changes'
+    )
+    j_reception_invitation_tracking_mode = fields.Selection(
+        TRACKING_MODES,
+        string='Invitation Tracking',
+        config_parameter='j_reception.tracking_mode.reception.invitation',
+        default='full',
+        help='Full: log every change. Batched: log scheduled action changes as a single note. None: do not log changes'
+    )
+    j_reception_chatter_retention_days = fields.Integer(
+        string='Chatter Retention (Days)',
+        config_parameter='j_reception.chatter_retention_days',
+        default=180,
+        help='Change notifications of past bookings and closed invitations older than this are deleted (0 = keep forever)'
+    )
+
+    j_reception_history_retention_days = fields.Integer(
+        string='History Retention (Days)',
+        config_parameter='j_reception.history_retention_days',
+        default=30,
+        help='Past bookings and closed invitations older than this are archived to the History menu (0 = never archive)'
+    )
 
     @api.model
     def get_values(self):
@@ -38,6 +86,7 @@ class ResConfigSettings(models.TransientModel):
         params = self.env['ir.config_parameter'].sudo()
         res.update(
             j_reception_location_url=params.get_param('j_reception.location_url', default=''),
+            j_reception_building_image=self._get_j_reception_building_image('original').datas,
         )
         return res
 
@@ -45,6 +94,82 @@ class ResConfigSettings(models.TransientModel):
         """
         Set configuration values
         """
+        previous_tz = get_building_tz_name(self.env)
         super(ResConfigSettings, self).set_values()
         params = self.env['ir.config_parameter'].sudo()
-        params.set_param('j_reception.location_url', self.j_reception_location_url or '')
\ No newline at end of file
+        if get_building_tz_name(self.env) != previous_tz:
+            self._apply_j_reception_building_tz()
+        params.set_param('j_reception.location_url', self.j_reception_location_url or '')
+        self._set_j_reception_building_image(self.j_reception_building_image)
+
+    @api.model
+    def _apply_j_reception_building_tz(self):
+        """
+        Rebuild the data depending on the building timezone after it changed
+        """
+        Booking = self.env['booking'].sudo().with_context(active_test=False)
+        bookings = Booking.search([])
+        self.env.add_to_compute(Booking._fields['name'], bookings)
+        bookings.recompute(['name'])
+        self.env['reception.report'].sudo().init()
+
+    @api.model
+    def _get_j_reception_building_image(self, variant='email'):
+        """
+        Return the attachment holding the given variant ('original' or 'email') of the building image
+        """
+        attachment_id = self.env['ir.config_parameter'].sudo().get_param(
+            'j_reception.building_image_%s_attachment_id' % variant
+        )
+        return self.env['ir.attachment'].sudo().browse(int(attachment_id or 0)).exists()
+
+    @api.model
+    def _set_j_reception_building_image(self, image):
+        """
+        Store the building image as public attachments, with a resized variant for emails
+
+        Nothing is written when the image has the same checksum as the stored one.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        Attachment = self.env['ir.attachment'].sudo()
+        original = self._get_j_reception_building_image('original')
+        email = self._get_j_reception_building_image('email')
+
+        raw_image = base64.b64decode(image) if image else b''
+        if original and raw_image and original.checksum == Attachment._compute_checksum(raw_image):
+            return
+
+        (original | email).unlink()
+        if not raw_image:
+            params.set_param('j_reception.building_image_original_attachment_id', False)
+            params.set_param('j_reception.building_image_email_attachment_id', False)
+            return
+
+        original = Attachment.create({
+            'name': 'building_image',
+            'raw': raw_image,
+            'public': True,
+            'res_model': 'res.config.settings',
+        })
+        email = Attachment.create({
+            'name': 'building_image_email',
+            'raw': tools.image_process(raw_image, size=BUILDING_IMAGE_EMAIL_SIZE),
+            'public': True,
+            'res_model': 'res.config.settings',
+        })
+        params.set_param('j_reception.building_image_original_attachment_id', original.id)
+        params.set_param('j_reception.building_image_email_attachment_id', email.id)
+
+    @api.model
+    def _get_j_reception_building_image_url(self):
+        """
+        Return the public URL of the building image used in emails, or an empty string
+
+        The URL carries the image checksum, so /web/image serves it with a long
+        Cache-Control and an ETag, and a new image gets a new URL.
+        """
+        attachment = self._get_j_reception_building_image('email')
+        if not attachment:
+            return ''
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        return '%s/web/image/%s?unique=%s' % (base_url, attachment.id, attachment.checksum)
\ No newline at end of file
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Partner extension for the guest suggestions of invitations
+"""
+
+from odoo import models, api, tools
+
+
+class ResPartner(models.Model):
+    """
+    Rank the guests of the officer's renter first when picking an invitation guest
+    """
+    _inherit = 'res.partner'
+
+    def init(self):
+        """
+        Index the normalized email, used to match the guests of imported invitations
+        """
+        tools.create_index(self._cr, 'res_partner_email_normalized_idx', self._table, ['email_normalized'])
+
+    def write(self, vals):
+        """
+        Override write to keep the guest directory in sync with the partners
+        """
+        result = super(ResPartner, self).write(vals)
+        if {'name', 'email', 'phone'} & set(vals):
+            self.env['reception.guest'].sudo()._sync_partners(self)
+        return result
+
+    @api.model
+    def _name_search(self, name, args=None, operator='ilike', limit=100, name_get_uid=None):
+        """
+        Override to suggest the recent guests of the renter first
+
+        Only active when the reception_guest_officer_id context key is set,
+        as done by the guest field of invitations. The renter's guests matching
+        the typed text and the search domain come first, most recently invited
+        first, and the standard search completes the list. The directory of
+        the current user's renter is used, only reception administrators can
+        pick the officer through the context.
+        """
+        officer_id = self.env.context.get('reception_guest_officer_id')
+        if not (officer_id and name and operator == 'ilike'):
+            return super(ResPartner, self)._name_search(
+                name, args=args, operator=operator, limit=limit, name_get_uid=name_get_uid
+            )
+
+        if self.env['reception.invitation']._get_reception_role() != 'admin':
+            officer_id = self.env.uid
+        renter = self.env['building.renter']._get_renter_for_officer(officer_id)
+        guest_ids = []
+        if renter:
+            guest_ids = self.env['reception.guest'].sudo()._search_guest_partners(
+                renter.id, name, limit=limit or 100
+            )
+        if guest_ids:
+            # Apply the search domain and the access rules, keeping the directory order
+            allowed_ids = set(self._search(
+                [('id', 'in', guest_ids)] + list(args or []), access_rights_uid=name_get_uid
+            ))
+            guest_ids = [guest_id for guest_id in guest_ids if guest_id in allowed_ids]
+        if limit and len(guest_ids) >= limit:
+            return guest_ids[:limit]
+
+        other_ids = super(ResPartner, self)._name_search(
+            name, args=list(args or []) + [('id', 'not in', guest_ids)], operator=operator,
+            limit=limit and limit - len(guest_ids), name_get_uid=name_get_uid
+        )
+        return guest_ids + list(other_ids)
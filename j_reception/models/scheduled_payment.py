@@ -3,7 +3,7 @@
 Scheduled Payment model for managing payment schedules
 """
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
 
 
@@ -44,6 +44,38 @@ class ScheduledPayment(models.Model):
         default=False,
         help='Whether notification email has been sent for this payment'
     )
+    is_paid = fields.Boolean(
+        string='Paid',
+        default=False,
+        copy=False,
+        help='Whether the renter has paid this payment, unpaid ones count in the outstanding totals'
+    )
+    notification_date = fields.Datetime(
+        string='Notification Date',
+        readonly=True,
+        copy=False,
+        help='When the due payment notification was queued for this payment'
+    )
+    notification_mail_id = fields.Many2one(
+        'mail.mail',
+        string='Notification Email',
+        ondelete='set null',
+        readonly=True,
+        copy=False,
+        help='The email queued to notify this payment, until it is sent and cleaned up'
+    )
+    notification_state = fields.Selection([
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ], string='Notification Status', readonly=True, copy=False,
+       help='Outcome of the due payment notification')
+    notification_error = fields.Text(
+        string='Notification Error',
+        readonly=True,
+        copy=False,
+        help='Why the due payment notification could not be rendered or delivered'
+    )
     currency_id = fields.Many2one(
         'res.currency',
         string='Currency',
@@ -51,6 +83,30 @@ class ScheduledPayment(models.Model):
         default=lambda self: self.env.company.currency_id,
         help='Currency for this payment'
     )
+    plan_id = fields.Many2one(
+        'scheduled.payment.plan',
+        string='Payment Plan',
+        ondelete='set null',
+        index=True,
+        readonly=True,
+        help='The payment plan that generated this payment'
+    )
+
+    _sql_constraints = [
+        ('plan_due_date_unique', 'unique(plan_id, due_date)', 'A payment plan can only have one payment per due date.'),
+    ]
+
+    def init(self):
+        """
+        Partial index on the payments still waiting for their notification
+        """
+        if not tools.index_exists(self._cr, 'scheduled_payment_due_unnotified_idx'):
+            # The predicate matches the SQL generated for ('is_notified', '=', False)
+            self._cr.execute("""
+                CREATE INDEX scheduled_payment_due_unnotified_idx
+                    ON scheduled_payment (due_date)
+                 WHERE (is_notified IS NULL OR is_notified = false)
+            """)
 
     @api.constrains('amount')
     def _check_amount_positive(self):
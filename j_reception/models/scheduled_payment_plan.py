@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Scheduled Payment Plan model for generating recurring payments
+"""
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+from dateutil.relativedelta import relativedelta
+from datetime import timedelta
+
+# Time between two installments for each plan frequency
+PLAN_FREQUENCY_STEPS = {
+    'weekly': relativedelta(weeks=1),
+    'monthly': relativedelta(months=1),
+    'quarterly': relativedelta(months=3),
+    'yearly': relativedelta(years=1),
+}
+
+
+class ScheduledPaymentPlan(models.Model):
+    """
+    Model to manage recurring payment plans for renters
+    """
+    _name = 'scheduled.payment.plan'
+    _description = 'Scheduled Payment Plan'
+    _order = 'start_date'
+
+    renter_id = fields.Many2one(
+        'building.renter',
+        string='Renter',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        help='The renter paying this plan'
+    )
+    description = fields.Char(
+        string='Description',
+        required=True,
+        placeholder='e.g., Monthly Rent, Maintenance Fee',
+        help='Description given to the generated payments'
+    )
+    amount = fields.Float(
+        string='Amount',
+        required=True,
+        placeholder='0.00',
+        help='Amount of every installment'
+    )
+    currency_id = fields.Many2one(
+        'res.currency',
+        string='Currency',
+        required=True,
+        default=lambda self: self.env.company.currency_id,
+        help='Currency of the installments'
+    )
+    frequency = fields.Selection([
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('quarterly', 'Quarterly'),
+        ('yearly', 'Yearly'),
+    ], string='Frequency', default='monthly', required=True,
+       help='How often an installment is due')
+    start_date = fields.Date(
+        string='Start Date',
+        required=True,
+        help='Due date of the first installment'
+    )
+    end_date = fields.Date(
+        string='End Date',
+        help='No installment is due after this date, leave empty for an open-ended plan'
+    )
+    installment_count = fields.Integer(
+        string='Generated Installments',
+        readonly=True,
+        copy=False,
+        help='Number of installments already generated as scheduled payments'
+    )
+    next_due_date = fields.Date(
+        string='Next Due Date',
+        compute='_compute_next_due_date',
+        store=True,
+        help='Due date of the next installment to generate, empty once the plan is complete'
+    )
+    payment_ids = fields.One2many(
+        'scheduled.payment',
+        'plan_id',
+        string='Payments',
+        help='Scheduled payments generated by this plan'
+    )
+    active = fields.Boolean(
+        string='Active',
+        default=True,
+        help='Archived plans do not generate payments anymore'
+    )
+
+    @api.depends('start_date', 'end_date', 'frequency', 'installment_count')
+    def _compute_next_due_date(self):
+        """
+        Compute the due date of the next installment to generate
+        """
+        for record in self:
+            next_due_date = record._get_installment_date(record.installment_count)
+            if next_due_date and record.end_date and next_due_date > record.end_date:
+                next_due_date = False
+            record.next_due_date = next_due_date
+
+    def _get_installment_date(self, index):
+        """
+        Return the due date of the installment at the given index, counted from the start date
+        """
+        self.ensure_one()
+        if not self.start_date:
+            return False
+        return self.start_date + PLAN_FREQUENCY_STEPS[self.frequency] * index
+
+    @api.constrains('amount')
+    def _check_amount_positive(self):
+        """
+        Ensure installment amount is positive
+        """
+        for record in self:
+            if record.amount <= 0:
+                raise ValidationError(_('Payment amount must be positive.'))
+
+    @api.constrains('start_date', 'end_date')
+    def _check_dates(self):
+        """
+        Ensure the plan does not end before it starts
+        """
+        for record in self:
+            if record.end_date and record.start_date and record.end_date < record.start_date:
+                raise ValidationError(_('The end date of a payment plan must be after its start date.'))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Override create to generate the installments of the current window
+        """
+        plans = super(ScheduledPaymentPlan, self).create(vals_list)
+        plans._generate_installments()
+        return plans
+
+    def write(self, vals):
+        """
+        Override write to re-anchor the installments after a schedule change
+        """
+        res = super(ScheduledPaymentPlan, self).write(vals)
+        if {'start_date', 'end_date', 'frequency'} & set(vals):
+            self._reset_installments()
+        if {'start_date', 'end_date', 'frequency', 'active'} & set(vals):
+            self._generate_installments()
+        return res
+
+    def _reset_installments(self):
+        """
+        Drop the installments that no longer follow the schedule, before generating them again
+
+        Upcoming installments that were neither notified nor paid are deleted,
+        as well as unnotified and unpaid ones after the end date. The counter
+        restarts after the last installment kept, so the next generation
+        follows the new schedule without clashing with the kept ones.
+        """
+        today = fields.Date.today()
+        payments = self.env['scheduled.payment'].search([('plan_id', 'in', self.ids)])
+        obsolete = payments.filtered(lambda payment: not payment.is_notified and not payment.is_paid and (
+            payment.due_date >= today
+            or (payment.plan_id.end_date and payment.due_date > payment.plan_id.end_date)
+        ))
+        obsolete.unlink()
+        kept = payments - obsolete
+        for plan in self:
+            last_due_date = max(kept.filtered(lambda payment: payment.plan_id == plan).mapped('due_date'), default=None)
+            index = 0
+            if last_due_date:
+                while plan._get_installment_date(index) <= last_due_date:
+                    index += 1
+            plan.installment_count = index
+
+    def _get_window_end(self):
+        """
+        Return the last due date covered by the rolling generation window
+        """
+        window_days = int(self.env['ir.config_parameter'].sudo().get_param('j_reception.payment_plan_window_days', 60))
+        return fields.Date.today() + timedelta(days=window_days)
+
+    def _generate_installments(self, window_end=None):
+        """
+        Create the scheduled payments due up to the end of the rolling window
+
+        The payments of all plans are created with a single create call, and
+        only the upcoming window is materialized instead of the whole plan.
+        Periods already past when a plan starts or is rescheduled in the past
+        are skipped, so that no batch of overdue reminders goes out at once.
+        """
+        window_end = window_end or self._get_window_end()
+        today = fields.Date.today()
+        vals_list = []
+        for plan in self.filtered(lambda plan: plan.active and plan.next_due_date and plan.next_due_date <= window_end):
+            index = plan.installment_count
+            due_date = plan.next_due_date
+            while due_date < today:
+                index += 1
+                due_date = plan._get_installment_date(index)
+            while due_date <= window_end and (not plan.end_date or due_date <= plan.end_date):
+                vals_list.append({
+                    'plan_id': plan.id,
+                    'renter_id': plan.renter_id.id,
+                    'description': plan.description,
+                    'amount': plan.amount,
+                    'currency_id': plan.currency_id.id,
+                    'due_date': due_date,
+                })
+                index += 1
+                due_date = plan._get_installment_date(index)
+            plan.installment_count = index
+        return self.env['scheduled.payment'].create(vals_list)
+
+    @api.model
+    def generate_scheduled_payments(self):
+        """
+        Cron method to generate the installments entering the rolling window
+        """
+        window_end = self._get_window_end()
+        plans = self.search([
+            ('next_due_date', '!=', False),
+            ('next_due_date', '<=', window_end)
+        ])
+        return plans._generate_installments(window_end)
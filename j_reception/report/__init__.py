@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Reporting package initialization for J Reception module
+"""
+from . import reception_report
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Reception dashboard report backed by a materialized view
+"""
+
+from odoo import models, fields, api
+import logging
+
+from ..utils import get_building_tz_name
+
+_logger = logging.getLogger(__name__)
+
+
+class ReceptionReport(models.Model):
+    """
+    Daily reception metrics pre-aggregated per tenant, facility and currency
+    """
+    _name = 'reception.report'
+    _description = 'Reception Dashboard'
+    _auto = False
+    _order = 'date desc'
+
+    kind = fields.Selection([
+        ('booking', 'Booking'),
+        ('invitation', 'Invitation'),
+        ('payment', 'Payment'),
+    ], string='Type', readonly=True)
+    date = fields.Date(string='Date', readonly=True)
+    renter_id = fields.Many2one('building.renter', string='Tenant', readonly=True)
+    facility_id = fields.Many2one('facilities', string='Facility', readonly=True)
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    booking_count = fields.Integer(string='Bookings', readonly=True)
+    booked_hours = fields.Float(string='Booked Hours', readonly=True)
+    invitation_count = fields.Integer(string='Invitations', readonly=True)
+    attended_count = fields.Integer(string='Attended', readonly=True)
+    no_show_count = fields.Integer(string='No-shows', readonly=True)
+    cancelled_count = fields.Integer(string='Cancelled', readonly=True)
+    payment_count = fields.Integer(string='Payments', readonly=True)
+    payment_amount = fields.Monetary(string='Payment Amount', readonly=True)
+
+    @api.model
+    def _get_report_timezone(self):
+        """
+        Return the timezone in which the report days are computed
+        """
+        return get_building_tz_name(self.env)
+
+    def _query(self):
+        """
+        Return the query aggregating bookings, invitations and payments per day
+        """
+        return """
+            SELECT row_number() OVER (ORDER BY kind, date, renter_id, facility_id, currency_id) AS id,
+                   metrics.*
+              FROM (
+                    SELECT 'booking'::varchar AS kind,
+                           (b.booking_datetime AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date AS date,
+                           b.renter_id AS renter_id,
+                           b.facility_id AS facility_id,
+                           NULL::integer AS currency_id,
+                           COUNT(*) AS booking_count,
+                           COALESCE(SUM(EXTRACT(EPOCH FROM b.booking_end - b.booking_datetime)) / 3600.0, 0) AS booked_hours,
+                           0 AS invitation_count,
+                           0 AS attended_count,
+                           0 AS no_show_count,
+                           0 AS cancelled_count,
+                           0 AS payment_count,
+                           0.0 AS payment_amount
+                      FROM booking b
+                     GROUP BY 2, 3, 4
+
+                    UNION ALL
+
+                    SELECT 'invitation'::varchar,
+                           (i.invitation_datetime AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date,
+                           i.renter_id,
+                           NULL::integer,
+                           NULL::integer,
+                           0,
+                           0,
+                           COUNT(*),
+                           COUNT(*) FILTER (WHERE i.state = 'attended'),
+                           COUNT(*) FILTER (WHERE i.state = 'overdue'),
+                           COUNT(*) FILTER (WHERE i.state = 'cancelled'),
+                           0,
+                           0.0
+                      FROM reception_invitation i
+                     GROUP BY 2, 3
+
+                    UNION ALL
+
+                    SELECT 'payment'::varchar,
+                           p.due_date,
+                           p.renter_id,
+                           NULL::integer,
+                           p.currency_id,
+                           0,
+                           0,
+                           0,
+                           0,
+                           0,
+                           0,
+                           COUNT(*),
+                           SUM(p.amount)
+                      FROM scheduled_payment p
+                     GROUP BY 2, 3, 5
+              ) AS metrics
+        """
+
+    def init(self):
+        """
+        Create the materialized view and the unique index needed to refresh it concurrently
+        """
+        self.env.cr.execute("DROP MATERIALIZED VIEW IF EXISTS %s" % self._table)
+        self.env.cr.execute(
+            "CREATE MATERIALIZED VIEW %s AS (%s)" % (self._table, self._query()),
+            {'tz': self._get_report_timezone()}
+        )
+        self.env.cr.execute("CREATE UNIQUE INDEX %s_id_idx ON %s (id)" % (self._table, self._table))
+
+    @api.model
+    def refresh_report(self):
+        """
+        Cron method to refresh the dashboard figures
+
+        The view is refreshed concurrently, so the dashboard stays readable
+        while the figures are recomputed.
+        """
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY %s" % self._table)
+        self.invalidate_cache()
+        _logger.info("Reception: dashboard figures refreshed")
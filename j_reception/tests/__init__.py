@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+from . import test_booking
+from . import test_booking_recurrence
+from . import test_scheduled_payment_plan
+from . import test_query_counts
+from . import test_performance
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Common fixtures of the booking tests, data generators and measurement helpers of the performance tests
+"""
+
+from odoo import fields, Command
+from odoo.tests.common import TransactionCase
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Query count and wall time budgets of every measured scenario
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'perf_thresholds.json')
+# When this environment variable is set, the scenarios are not checked: their
+# measurements plus a small margin are written back to the thresholds file
+RECORD_ENV_VARIABLE = 'RECEPTION_PERF_RECORD'
+
+
+class ReceptionBookingCase(TransactionCase):
+    """
+    Two facilities, two durations and a renter to book them
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(ReceptionBookingCase, cls).setUpClass()
+        cls.hour = cls.env['duration'].create({'minutes': 60})
+        cls.half_hour = cls.env['duration'].create({'minutes': 30})
+        cls.gym, cls.pool = cls.env['facilities'].create([{'name': 'Gym'}, {'name': 'Pool'}])
+        officer = cls.env['res.users'].with_context(no_reset_password=True).create({
+            'name': 'Booking Officer',
+            'login': 'reception_booking_officer',
+        })
+        cls.renter = cls.env['building.renter'].create({
+            'company_id': cls.env['res.partner'].create({'name': 'Booking Company', 'is_company': True}).id,
+            'officer_id': officer.id,
+        })
+        # 09:00 UTC two days from now: far from the current time, and the
+        # following hours stay on the same day in the officer's timezone
+        cls.start = datetime.combine(fields.Date.today() + timedelta(days=2), datetime.min.time()) + timedelta(hours=9)
+
+    def _book(self, facility, start, duration=None):
+        return self.env['booking'].create({
+            'facility_id': facility.id,
+            'duration_id': (duration or self.hour).id,
+            'renter_id': self.renter.id,
+            'officer_id': self.renter.officer_id.id,
+            'booking_datetime': start,
+        })
+
+
+class ReceptionPerformanceCase(TransactionCase):
+    """
+    Seed renters, facilities, bookings and invitations, and measure scenarios against stored thresholds
+
+    Bulk data is inserted with SQL so that large datasets stay cheap to set up;
+    the records created inside the scenarios go through the ORM.
+    """
+    RENTER_COUNT = 5
+    FACILITY_COUNT = 4
+    BOOKING_COUNT = 200
+    INVITATION_COUNT = 200
+    PAYMENT_COUNT = 0
+    # Number of records handled by every create/write scenario
+    BATCH_SIZE = 20
+    # Query counts are checked by the standard suite, wall times by the load suite
+    CHECK_QUERIES = True
+    CHECK_TIME = False
+
+    @classmethod
+    def setUpClass(cls):
+        super(ReceptionPerformanceCase, cls).setUpClass()
+        with open(THRESHOLDS_FILE) as thresholds_file:
+            cls.thresholds = json.load(thresholds_file)
+
+        params = cls.env['ir.config_parameter'].sudo()
+        params.set_param('j_reception.async_email', True)
+        params.set_param('j_reception.daily_booking_limit', 48 * 60)
+
+        cls.duration = cls.env['duration'].create({'minutes': 60})
+        cls.short_duration = cls.env['duration'].create({'minutes': 30})
+        cls.facilities = cls.env['facilities'].create([
+            {'name': 'Perf Facility %s' % index} for index in range(cls.FACILITY_COUNT)
+        ])
+        renter_group = cls.env.ref('j_reception.group_j_reception_renter')
+        cls.officers = cls.env['res.users'].with_context(no_reset_password=True).create([{
+            'name': 'Perf Officer %s' % index,
+            'login': 'reception_perf_officer_%s' % index,
+            'email': 'reception.perf.officer.%s@example.com' % index,
+            'groups_id': [Command.set([cls.env.ref('base.group_user').id, renter_group.id])],
+        } for index in range(cls.RENTER_COUNT)])
+        companies = cls.env['res.partner'].create([
+            {'name': 'Perf Company %s' % index, 'is_company': True} for index in range(cls.RENTER_COUNT)
+        ])
+        cls.renters = cls.env['building.renter'].create([
+            {'company_id': company.id, 'officer_id': officer.id}
+            for company, officer in zip(companies, cls.officers)
+        ])
+        cls.guests = cls.env['res.partner'].create([{
+            'name': 'Perf Guest %s' % index,
+            'email': 'reception.perf.guest.%s@example.com' % index,
+        } for index in range(50)])
+
+        # Generated bookings fill consecutive hourly slots from slot_start on,
+        # the scenarios book the slots after them
+        cls.slot_start = fields.Datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=30)
+        cls.next_slot = cls.BOOKING_COUNT // cls.FACILITY_COUNT + 1
+
+        cls.record = bool(os.environ.get(RECORD_ENV_VARIABLE))
+        cls.recorded = {}
+
+        cls._generate_bookings(cls.BOOKING_COUNT)
+        cls._generate_invitations(cls.INVITATION_COUNT)
+        cls._generate_payments(cls.PAYMENT_COUNT)
+        cls.env.cr.execute("ANALYZE booking, reception_invitation, scheduled_payment")
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.recorded:
+            with open(THRESHOLDS_FILE) as thresholds_file:
+                thresholds = json.load(thresholds_file)
+            for scenario, measures in cls.recorded.items():
+                thresholds.setdefault(scenario, {}).update(measures)
+            with open(THRESHOLDS_FILE, 'w') as thresholds_file:
+                thresholds_file.write('{\n%s\n}\n' % ',\n'.join(
+                    '    %s: %s' % (json.dumps(scenario), json.dumps(thresholds[scenario]))
+                    for scenario in thresholds
+                ))
+            _logger.info("Reception performance thresholds recorded in %s", THRESHOLDS_FILE)
+        super(ReceptionPerformanceCase, cls).tearDownClass()
+
+    @classmethod
+    def _generate_bookings(cls, count):
+        """
+        Insert count non-overlapping bookings spread over the facilities and renters
+        """
+        cls.env.cr.execute("""
+            INSERT INTO booking (name, facility_id, duration_id, officer_id, renter_id,
+                                 booking_datetime, booking_end, active,
+                                 create_uid, create_date, write_uid, write_date)
+            SELECT 'Perf Booking ' || s,
+                   (%(facility_ids)s::int[])[1 + s %% %(facility_count)s],
+                   %(duration_id)s,
+                   (%(officer_ids)s::int[])[1 + (s / %(facility_count)s) %% %(renter_count)s],
+                   (%(renter_ids)s::int[])[1 + (s / %(facility_count)s) %% %(renter_count)s],
+                   %(start)s + (s / %(facility_count)s) * interval '60 minutes',
+                   %(start)s + (s / %(facility_count)s + 1) * interval '60 minutes',
+                   true,
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM generate_series(0, %(count)s - 1) AS s
+        """, {
+            'facility_ids': cls.facilities.ids,
+            'facility_count': len(cls.facilities),
+            'officer_ids': cls.renters.officer_id.ids,
+            'renter_ids': cls.renters.ids,
+            'renter_count': len(cls.renters),
+            'duration_id': cls.duration.id,
+            'start': cls.slot_start,
+            'uid': cls.env.uid,
+            'count': count,
+        })
+        cls.env['booking'].invalidate_cache()
+
+    @classmethod
+    def _generate_invitations(cls, count):
+        """
+        Insert count invitations cycling through the states, half of them in the past
+        """
+        cls.env.cr.execute("""
+            INSERT INTO reception_invitation (sequence, name, subject, state, officer_id, renter_id,
+                                              guest_partner_id, invitation_datetime, checkin_token, active,
+                                              create_uid, create_date, write_uid, write_date)
+            SELECT 'PERF' || lpad(s::text, 7, '0'),
+                   'Perf Invitation ' || s,
+                   'Perf visit',
+                   (ARRAY['draft', 'scheduled', 'attended', 'cancelled'])[1 + s %% 4],
+                   (%(officer_ids)s::int[])[1 + s %% %(renter_count)s],
+                   (%(renter_ids)s::int[])[1 + s %% %(renter_count)s],
+                   (%(guest_ids)s::int[])[1 + s %% %(guest_count)s],
+                   %(now)s + ((s %% 2000) - 1000) * interval '1 hour',
+                   md5(random()::text || s),
+                   true,
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM generate_series(0, %(count)s - 1) AS s
+        """, {
+            'officer_ids': cls.renters.officer_id.ids,
+            'renter_ids': cls.renters.ids,
+            'renter_count': len(cls.renters),
+            'guest_ids': cls.guests.ids,
+            'guest_count': len(cls.guests),
+            'now': fields.Datetime.now(),
+            'uid': cls.env.uid,
+            'count': count,
+        })
+        cls.env['reception.invitation'].invalidate_cache()
+
+    @classmethod
+    def _generate_payments(cls, count):
+        """
+        Insert count unnotified scheduled payments due today
+        """
+        cls.env.cr.execute("""
+            INSERT INTO scheduled_payment (renter_id, description, amount, currency_id, due_date, is_notified,
+                                           create_uid, create_date, write_uid, write_date)
+            SELECT (%(renter_ids)s::int[])[1 + s %% %(renter_count)s],
+                   'Perf Payment ' || s,
+                   100 + s %% 900,
+                   %(currency_id)s,
+                   %(today)s,
+                   false,
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM generate_series(0, %(count)s - 1) AS s
+        """, {
+            'renter_ids': cls.renters.ids,
+            'renter_count': len(cls.renters),
+            'currency_id': cls.env.company.currency_id.id,
+            'today': fields.Date.today(),
+            'uid': cls.env.uid,
+            'count': count,
+        })
+        cls.env['scheduled.payment'].invalidate_cache()
+
+    def _new_booking_vals(self, count=None):
+        """
+        Return the values of count bookings in free slots after the generated ones
+        """
+        count = count or self.BATCH_SIZE
+        vals_list = []
+        for index in range(count):
+            renter = self.renters[index % len(self.renters)]
+            slot = self.next_slot + index // len(self.facilities)
+            vals_list.append({
+                'facility_id': self.facilities[index % len(self.facilities)].id,
+                'duration_id': self.duration.id,
+                'renter_id': renter.id,
+                'officer_id': renter.officer_id.id,
+                'booking_datetime': self.slot_start + timedelta(hours=slot),
+            })
+        # Every call books new slots, so warm-up runs do not conflict
+        type(self).next_slot += count // len(self.facilities) + 1
+        return vals_list
+
+    def _new_invitation_vals(self, count=None):
+        """
+        Return the values of count draft invitations in the future
+        """
+        count = count or self.BATCH_SIZE
+        return [{
+            'officer_id': self.renters[index % len(self.renters)].officer_id.id,
+            'guest_partner_id': self.guests[index % len(self.guests)].id,
+            'subject': 'Perf visit',
+            'invitation_datetime': fields.Datetime.now() + timedelta(days=1, hours=index),
+        } for index in range(count)]
+
+    def assertSeededData(self):
+        """
+        Check that the generated rows are visible through the ORM
+
+        Scenarios measured on rows hidden by the active filter or the record
+        rules would read nothing and pass their thresholds for nothing.
+        """
+        Booking = self.env['booking']
+        Invitation = self.env['reception.invitation']
+        self.assertEqual(Booking.search_count([('name', '=like', 'Perf Booking %')]), self.BOOKING_COUNT)
+        self.assertEqual(Invitation.search_count([('name', '=like', 'Perf Invitation %')]), self.INVITATION_COUNT)
+        self.assertEqual(
+            self.env['scheduled.payment'].search_count([('description', '=like', 'Perf Payment %')]),
+            self.PAYMENT_COUNT
+        )
+        # Officers read every booking but only the invitations of their renter
+        officer = self.officers[0]
+        self.assertEqual(
+            Booking.with_user(officer).search_count([('name', '=like', 'Perf Booking %')]), self.BOOKING_COUNT
+        )
+        self.assertEqual(
+            Invitation.with_user(officer).search_count([('name', '=like', 'Perf Invitation %')]),
+            len(range(0, self.INVITATION_COUNT, self.RENTER_COUNT))
+        )
+
+    def _get_view_fields(self, model, view_type):
+        """
+        Return the names of the fields displayed by the default view of the given type
+        """
+        return list(self.env[model].fields_view_get(view_type=view_type)['fields'])
+
+    @contextmanager
+    def assertPerformance(self, scenario):
+        """
+        Measure the enclosed block and compare it with the thresholds of the scenario
+
+        Query counts go through assertQueryCount, so they are only checked on the
+        warm run of @warmup tests; wall times are checked when CHECK_TIME is set.
+        In record mode nothing is checked, and the measurements of the warm runs
+        are written to the thresholds file when the class is torn down.
+        """
+        threshold = self.thresholds[scenario]
+        self.env['base'].flush()
+        query_count = self.cr.sql_log_count
+        started = time.perf_counter()
+        if self.CHECK_QUERIES and 'queries' in threshold and not self.record:
+            with self.assertQueryCount(threshold['queries']):
+                yield
+        else:
+            yield
+            self.env['base'].flush()
+        elapsed = time.perf_counter() - started
+        queries = self.cr.sql_log_count - query_count
+        _logger.info("Reception performance %s: %s queries in %.3fs", scenario, queries, elapsed)
+        if self.record:
+            # Cold runs of @warmup tests fill the caches and are not recorded
+            if getattr(self, 'warm', True):
+                if self.CHECK_QUERIES:
+                    self.recorded.setdefault(scenario, {})['queries'] = queries + max(2, queries // 10)
+                if self.CHECK_TIME:
+                    self.recorded.setdefault(scenario, {})['seconds'] = round(max(0.1, elapsed * 1.5), 2)
+            return
+        if self.CHECK_TIME and 'seconds' in threshold:
+            self.assertLessEqual(
+                elapsed, threshold['seconds'],
+                "Scenario %s took %.3fs, more than its %.3fs budget" % (scenario, elapsed, threshold['seconds'])
+            )
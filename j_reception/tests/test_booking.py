@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.exceptions import UserError, ValidationError
+from odoo.tests.common import tagged
+from datetime import timedelta
+
+from .common import ReceptionBookingCase
+
+
+@tagged('post_install', '-at_install')
+class TestBooking(ReceptionBookingCase):
+    """
+    Free slots, conflict detection and daily limit of bookings
+    """
+
+    def _free_slots(self, date_from, date_to, duration=None, facilities=None):
+        result = self.env['facilities'].get_free_slots(
+            date_from, date_to, (duration or self.hour).id, facility_ids=(facilities or self.gym).ids
+        )
+        return {
+            entry['facility_id']: [
+                (fields.Datetime.to_datetime(slot['start']), fields.Datetime.to_datetime(slot['end']))
+                for slot in entry['free_slots']
+            ] for entry in result
+        }
+
+    def test_free_slots_sweep(self):
+        start = self.start
+        self._book(self.gym, start + timedelta(hours=1))
+        self._book(self.gym, start + timedelta(hours=2), self.half_hour)
+        # Overlapping bookings of another facility do not matter
+        self._book(self.pool, start)
+
+        slots = self._free_slots(start, start + timedelta(hours=5), facilities=self.gym | self.pool)
+        self.assertEqual(slots[self.gym.id], [
+            (start, start + timedelta(hours=1)),
+            (start + timedelta(hours=2, minutes=30), start + timedelta(hours=5)),
+        ])
+        self.assertEqual(slots[self.pool.id], [(start + timedelta(hours=1), start + timedelta(hours=5))])
+
+    def test_free_slots_minimum_length(self):
+        start = self.start
+        self._book(self.gym, start + timedelta(minutes=30))
+        # The 30 minutes gap before the booking is too short for an hour
+        slots = self._free_slots(start, start + timedelta(hours=3))
+        self.assertEqual(slots[self.gym.id], [(start + timedelta(hours=1, minutes=30), start + timedelta(hours=3))])
+        slots = self._free_slots(start, start + timedelta(hours=3), duration=self.half_hour)
+        self.assertEqual(slots[self.gym.id][0], (start, start + timedelta(minutes=30)))
+
+    def test_free_slots_ignore_archived_bookings(self):
+        booking = self._book(self.gym, self.start)
+        slots = self._free_slots(self.start, self.start + timedelta(hours=2))
+        self.assertEqual(slots[self.gym.id], [(self.start + timedelta(hours=1), self.start + timedelta(hours=2))])
+        # Bypass the archive check of ended bookings to archive a future one
+        self.env.cr.execute("UPDATE booking SET active = false WHERE id = %s", (booking.id,))
+        booking.invalidate_cache()
+        slots = self._free_slots(self.start, self.start + timedelta(hours=2))
+        self.assertEqual(slots[self.gym.id], [(self.start, self.start + timedelta(hours=2))])
+
+    def test_free_slots_start_now(self):
+        now = fields.Datetime.now()
+        slots = self._free_slots(now - timedelta(days=1), now + timedelta(hours=3))
+        self.assertEqual(len(slots[self.gym.id]), 1)
+        self.assertGreaterEqual(slots[self.gym.id][0][0], now)
+        # A range entirely in the past has no free slot
+        slots = self._free_slots(now - timedelta(days=1), now - timedelta(hours=1))
+        self.assertEqual(slots[self.gym.id], [])
+
+    def test_free_slots_invalid_arguments(self):
+        with self.assertRaises(UserError):
+            self.env['facilities'].get_free_slots(self.start, self.start, self.hour.id)
+        with self.assertRaises(UserError):
+            self.env['facilities'].get_free_slots(
+                self.start, self.start + timedelta(hours=1), self.hour.id + self.half_hour.id + 1000
+            )
+
+    def test_daily_limit_batch(self):
+        self.env['ir.config_parameter'].sudo().set_param('j_reception.daily_booking_limit', 120)
+        with self.assertRaises(ValidationError):
+            self.env['booking'].create([{
+                'facility_id': facility.id,
+                'duration_id': self.hour.id,
+                'renter_id': self.renter.id,
+                'officer_id': self.renter.officer_id.id,
+                'booking_datetime': self.start + timedelta(hours=hours),
+            } for hours, facility in enumerate([self.gym, self.pool, self.gym])])
+
+    def test_daily_limit_same_transaction(self):
+        self.env['ir.config_parameter'].sudo().set_param('j_reception.daily_booking_limit', 120)
+        self._book(self.gym, self.start)
+        self._book(self.pool, self.start + timedelta(hours=1))
+        # Neither booking above is flushed yet
+        with self.assertRaises(ValidationError):
+            self._book(self.gym, self.start + timedelta(hours=2))
+
+    def test_conflict_same_transaction(self):
+        # The first booking is still waiting to be flushed when the second one
+        # is validated, no savepoint flushes it in between
+        self._book(self.gym, self.start)
+        with self.assertRaises(ValidationError):
+            self._book(self.gym, self.start + timedelta(minutes=30))
+
+    def test_conflict_moved_same_transaction(self):
+        first = self._book(self.gym, self.start)
+        second = self._book(self.gym, self.start + timedelta(hours=2))
+        first.booking_datetime = self.start + timedelta(hours=4)
+        with self.assertRaises(ValidationError):
+            second.write({'booking_datetime': self.start + timedelta(hours=4, minutes=30)})
+
+    def test_conflict_constraint(self):
+        self._book(self.gym, self.start)
+        with self.assertRaises(ValidationError), self.cr.savepoint():
+            self._book(self.gym, self.start + timedelta(minutes=30))
+        # Bookings of one batch conflicting with each other are rejected too
+        with self.assertRaises(ValidationError), self.cr.savepoint():
+            self.env['booking'].create([{
+                'facility_id': self.pool.id,
+                'duration_id': self.hour.id,
+                'renter_id': self.renter.id,
+                'officer_id': self.renter.officer_id.id,
+                'booking_datetime': self.start + timedelta(minutes=minutes),
+            } for minutes in (0, 30)])
+        self._book(self.gym, self.start + timedelta(hours=1))
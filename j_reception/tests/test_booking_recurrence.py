@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+from odoo.exceptions import UserError
+from odoo.tests.common import tagged
+from datetime import timedelta
+
+from .common import ReceptionBookingCase
+from ..models.booking import MAX_RECURRING_BOOKINGS
+
+
+@tagged('post_install', '-at_install')
+class TestBookingRecurrence(ReceptionBookingCase):
+    """
+    Recurrence expansion and batch conflict detection of bookings
+    """
+
+    def test_recurrence_expansion(self):
+        bookings = self.env['booking'].create({
+            'facility_id': self.gym.id,
+            'duration_id': self.hour.id,
+            'renter_id': self.renter.id,
+            'officer_id': self.renter.officer_id.id,
+            'booking_datetime': self.start,
+            'recurrence_rule': 'FREQ=WEEKLY;COUNT=3',
+        })
+        self.assertEqual(
+            sorted(bookings.mapped('booking_datetime')),
+            [self.start + timedelta(weeks=week) for week in range(3)]
+        )
+
+    def test_recurrence_keeps_start(self):
+        # Expand in UTC, so that the expected dates do not cross a daylight saving change
+        self.env.user.tz = 'UTC'
+        # The rule only matches the day after the start
+        rule = 'FREQ=WEEKLY;BYDAY=%s;COUNT=2' % ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU'][(self.start.weekday() + 1) % 7]
+        vals = {
+            'facility_id': self.gym.id,
+            'duration_id': self.hour.id,
+            'renter_id': self.renter.id,
+            'officer_id': self.renter.officer_id.id,
+            'booking_datetime': self.start,
+            'recurrence_rule': rule,
+        }
+        bookings = self.env['booking'].create([vals])
+        self.assertEqual(
+            sorted(bookings.mapped('booking_datetime')),
+            [self.start, self.start + timedelta(days=1), self.start + timedelta(days=8)]
+        )
+        # The values of the caller are not modified
+        self.assertEqual(vals['recurrence_rule'], rule)
+
+    def test_recurrence_limits(self):
+        with self.assertRaises(UserError):
+            self.env['booking']._expand_recurrence(self.start, 'FREQ=DAILY')
+        with self.assertRaises(UserError):
+            self.env['booking']._expand_recurrence(self.start, 'FREQ=DAILY;COUNT=%s' % (MAX_RECURRING_BOOKINGS + 1))
+        self.assertEqual(len(self.env['booking']._expand_recurrence(self.start, 'FREQ=DAILY;COUNT=5')), 5)
+
+    def test_conflict_sweep(self):
+        start = self.start
+        existing = self._book(self.gym, start)
+        conflicts = self.env['booking']._find_booking_conflicts([
+            # Overlaps the existing booking
+            (self.gym.id, start + timedelta(minutes=30), start + timedelta(minutes=90)),
+            # Starts when the existing booking ends, but overlaps the first candidate
+            (self.gym.id, start + timedelta(hours=1), start + timedelta(hours=2)),
+            # Overlaps the previous candidate
+            (self.gym.id, start + timedelta(minutes=90), start + timedelta(hours=3)),
+            # Same time, other facility
+            (self.pool.id, start, start + timedelta(hours=1)),
+        ])
+        self.assertEqual([conflict[0] for conflict in conflicts], [0, 1, 2])
+        self.assertEqual(conflicts[0][1:], (start, start + timedelta(hours=1)))
+
+        # The booking being validated is not a conflict with itself
+        self.assertFalse(self.env['booking']._find_booking_conflicts(
+            [(self.gym.id, start, start + timedelta(hours=1))], exclude_ids=existing.ids
+        ))
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, Command, SUPERUSER_ID
+from odoo.sql_db import db_connect
+from odoo.tests.common import tagged
+from contextlib import contextmanager
+from datetime import timedelta
+import logging
+import threading
+import time
+
+from .common import ReceptionPerformanceCase
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('-standard', 'reception_perf')
+class TestReceptionPerformance(ReceptionPerformanceCase):
+    """
+    Wall time of the reception hot paths on a production-sized dataset
+
+    Not part of the standard test run, use --test-tags reception_perf.
+    """
+    RENTER_COUNT = 50
+    FACILITY_COUNT = 20
+    BOOKING_COUNT = 100000
+    INVITATION_COUNT = 100000
+    PAYMENT_COUNT = 10000
+    CHECK_QUERIES = False
+    CHECK_TIME = True
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestReceptionPerformance, cls).setUpClass()
+        # Let the crons go through the whole backlog in a single run
+        cls.env['ir.config_parameter'].sudo().set_param('j_reception.overdue_time_budget', 3600)
+
+    def test_seeded_data(self):
+        self.assertSeededData()
+
+    def test_booking_create(self):
+        vals_list = self._new_booking_vals()
+        with self.assertPerformance('booking_create'):
+            self.env['booking'].create(vals_list)
+
+    def test_booking_write(self):
+        bookings = self.env['booking'].create(self._new_booking_vals())
+        with self.assertPerformance('booking_write'):
+            bookings.write({'duration_id': self.short_duration.id})
+
+    def test_booking_constraints(self):
+        bookings = self.env['booking'].search([], limit=100)
+        with self.assertPerformance('booking_constraints'):
+            bookings._check_booking_conflict()
+            bookings._check_daily_booking_limit()
+
+    def test_booking_read(self):
+        Booking = self.env['booking'].with_user(self.officers[0])
+        list_fields = self._get_view_fields('booking', 'tree')
+        kanban_fields = self._get_view_fields('booking', 'kanban')
+        with self.assertPerformance('booking_list_read'):
+            Booking.web_search_read([], list_fields, limit=80)
+        with self.assertPerformance('booking_kanban_read'):
+            Booking.web_search_read([], kanban_fields, limit=80)
+
+    def test_invitation_create(self):
+        vals_list = self._new_invitation_vals()
+        with self.assertPerformance('invitation_create'):
+            self.env['reception.invitation'].create(vals_list)
+
+    def test_invitation_confirm(self):
+        invitations = self.env['reception.invitation'].create(self._new_invitation_vals())
+        with self.assertPerformance('invitation_confirm'):
+            invitations.action_confirm()
+
+    def test_invitation_attend(self):
+        invitations = self.env['reception.invitation'].create(self._new_invitation_vals())
+        invitations.action_confirm()
+        with self.assertPerformance('invitation_attend'):
+            invitations.action_mark_attended()
+
+    def test_invitation_read(self):
+        Invitation = self.env['reception.invitation'].with_user(self.officers[0])
+        list_fields = self._get_view_fields('reception.invitation', 'tree')
+        kanban_fields = self._get_view_fields('reception.invitation', 'kanban')
+        with self.assertPerformance('invitation_list_read'):
+            Invitation.web_search_read([], list_fields, limit=80)
+        with self.assertPerformance('invitation_kanban_read'):
+            Invitation.web_search_read([], kanban_fields, limit=80)
+
+    def test_cron_overdue_invitations(self):
+        backlog = self.env['reception.invitation'].search_count([
+            ('state', '=', 'scheduled'),
+            ('invitation_datetime', '<', fields.Datetime.now())
+        ])
+        with self.assertPerformance('cron_overdue_invitations'):
+            processed = self.env['reception.invitation'].check_overdue_invitations()
+        self.assertEqual(processed, backlog)
+
+    def test_cron_due_payments(self):
+        with self.assertPerformance('cron_due_payments'):
+            processed = self.env['building.renter'].check_due_payments()
+        self.assertEqual(processed, self.PAYMENT_COUNT)
+
+    @contextmanager
+    def _benchmark_sequence(self, implementation):
+        """
+        Commit an invitation sequence of the given implementation for the duration of a benchmark
+
+        Workers run in their own transactions, which only see committed data.
+        The sequence belongs to the current company, so next_by_code picks it
+        before the module sequence; nothing is altered on the module sequence,
+        whose PostgreSQL sequence may be locked by the test transaction.
+        """
+        dbname = self.env.cr.dbname
+        with db_connect(dbname).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            sequence = env['ir.sequence'].create({
+                'name': 'Reception Invitation Benchmark',
+                'code': 'reception.invitation',
+                'prefix': 'BENCH/',
+                'padding': 7,
+                'implementation': implementation,
+                'company_id': env.company.id,
+            })
+            cr.commit()
+        try:
+            yield
+        finally:
+            with db_connect(dbname).cursor() as cr:
+                api.Environment(cr, SUPERUSER_ID, {})['ir.sequence'].browse(sequence.id).unlink()
+                cr.commit()
+
+    @contextmanager
+    def _benchmark_officers(self, worker_count):
+        """
+        Commit one officer, renter and guest per worker, and delete them with their invitations afterwards
+
+        Every worker invites its own guest, so the workers do not contend on the
+        same guest directory line and only the sequence allocation is shared.
+        Yields a list of (officer id, guest partner id) per worker.
+        """
+        dbname = self.env.cr.dbname
+        with db_connect(dbname).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            renter_group = env.ref('j_reception.group_j_reception_renter')
+            officers = env['res.users'].with_context(no_reset_password=True).create([{
+                'name': 'Benchmark Officer %s' % index,
+                'login': 'reception_benchmark_officer_%s' % index,
+                'groups_id': [Command.set([env.ref('base.group_user').id, renter_group.id])],
+            } for index in range(worker_count)])
+            companies = env['res.partner'].create([
+                {'name': 'Benchmark Company %s' % index, 'is_company': True} for index in range(worker_count)
+            ])
+            renters = env['building.renter'].create([
+                {'company_id': company.id, 'officer_id': officer.id}
+                for company, officer in zip(companies, officers)
+            ])
+            guests = env['res.partner'].create([
+                {'name': 'Benchmark Guest %s' % index} for index in range(worker_count)
+            ])
+            cr.commit()
+            fixture = (officers.ids, renters.ids, (companies | guests | officers.partner_id).ids)
+        try:
+            yield list(zip(fixture[0], guests.ids))
+        finally:
+            with db_connect(dbname).cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['reception.invitation'].with_context(active_test=False).search([
+                    ('renter_id', 'in', fixture[1])
+                ]).unlink()
+                env['building.renter'].browse(fixture[1]).unlink()
+                env['res.users'].browse(fixture[0]).unlink()
+                env['res.partner'].browse(fixture[2]).unlink()
+                cr.commit()
+
+    def test_sequence_concurrency(self):
+        """
+        Concurrent invitation number allocation from separate transactions
+
+        Every worker reserves numbers in batches and commits after each batch,
+        like concurrent imports; the numbers must be unique. Runs with a
+        standard and with a no_gap sequence, whose row lock serializes the
+        workers, and logs both timings.
+        """
+        worker_count, batch_count, batch_size = 8, 25, 50
+        for implementation in ('standard', 'no_gap'):
+            numbers = []
+            errors = []
+
+            def allocate():
+                try:
+                    with db_connect(self.env.cr.dbname).cursor() as cr:
+                        env = api.Environment(cr, SUPERUSER_ID, {})
+                        for dummy in range(batch_count):
+                            numbers.extend(env['ir.sequence'].next_by_code_batch('reception.invitation', batch_size))
+                            cr.commit()
+                except Exception as error:
+                    errors.append(error)
+
+            with self._benchmark_sequence(implementation):
+                workers = [threading.Thread(target=allocate) for dummy in range(worker_count)]
+                with self.assertPerformance('sequence_concurrency_%s' % implementation):
+                    for worker in workers:
+                        worker.start()
+                    for worker in workers:
+                        worker.join()
+
+            self.assertFalse(errors)
+            self.assertEqual(len(numbers), worker_count * batch_count * batch_size)
+            self.assertEqual(len(set(numbers)), len(numbers))
+
+    def test_invitation_concurrency(self):
+        """
+        Concurrent invitation creation from separate transactions
+
+        Every worker creates invitations in batches of BATCH_SIZE and commits
+        after each batch. Runs with a standard and with a no_gap sequence and
+        logs the throughput of both, the evidence for the implementation of
+        the invitation sequence.
+        """
+        worker_count, batch_count = 8, 10
+        invitation_datetime = fields.Datetime.now() + timedelta(days=1)
+        with self._benchmark_officers(worker_count) as workers_data:
+            for implementation in ('standard', 'no_gap'):
+                sequences = []
+                errors = []
+
+                def create_invitations(officer_id, guest_id):
+                    try:
+                        with db_connect(self.env.cr.dbname).cursor() as cr:
+                            env = api.Environment(cr, SUPERUSER_ID, {})
+                            for dummy in range(batch_count):
+                                invitations = env['reception.invitation'].create([{
+                                    'officer_id': officer_id,
+                                    'guest_partner_id': guest_id,
+                                    'subject': 'Benchmark visit',
+                                    'invitation_datetime': invitation_datetime,
+                                } for dummy in range(self.BATCH_SIZE)])
+                                sequences.extend(invitations.mapped('sequence'))
+                                cr.commit()
+                    except Exception as error:
+                        errors.append(error)
+
+                with self._benchmark_sequence(implementation):
+                    workers = [
+                        threading.Thread(target=create_invitations, args=worker_data)
+                        for worker_data in workers_data
+                    ]
+                    started = time.perf_counter()
+                    with self.assertPerformance('invitation_concurrency_%s' % implementation):
+                        for worker in workers:
+                            worker.start()
+                        for worker in workers:
+                            worker.join()
+                    elapsed = time.perf_counter() - started
+
+                self.assertFalse(errors)
+                self.assertEqual(len(sequences), worker_count * batch_count * self.BATCH_SIZE)
+                self.assertEqual(len(set(sequences)), len(sequences))
+                _logger.info(
+                    "Reception performance invitation_concurrency_%s: %.0f invitations/s with %s workers",
+                    implementation, len(sequences) / elapsed, worker_count
+                )
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.tests.common import tagged, warmup
+from datetime import timedelta
+
+from .common import ReceptionPerformanceCase
+
+
+@tagged('post_install', '-at_install', 'reception_perf')
+class TestReceptionQueryCounts(ReceptionPerformanceCase):
+    """
+    Query counts of the booking and invitation hot paths on a small dataset
+
+    The scenarios handle BATCH_SIZE records at once, so a per-record query
+    added to models/booking.py or models/reception_invitation.py pushes the
+    count over its stored threshold and fails the build.
+    """
+
+    def test_seeded_data(self):
+        self.assertSeededData()
+
+    @warmup
+    def test_booking_create(self):
+        vals_list = self._new_booking_vals()
+        with self.assertPerformance('booking_create'):
+            self.env['booking'].create(vals_list)
+
+    @warmup
+    def test_booking_write(self):
+        bookings = self.env['booking'].create(self._new_booking_vals())
+        with self.assertPerformance('booking_write'):
+            bookings.write({'duration_id': self.short_duration.id})
+
+    @warmup
+    def test_booking_constraints(self):
+        bookings = self.env['booking'].search([], limit=100)
+        bookings.mapped('booking_end')
+        bookings.mapped('duration_id.minutes')
+        with self.assertPerformance('booking_constraints'):
+            bookings._check_booking_conflict()
+            bookings._check_daily_booking_limit()
+
+    @warmup
+    def test_booking_read(self):
+        Booking = self.env['booking'].with_user(self.officers[0])
+        list_fields = self._get_view_fields('booking', 'tree')
+        kanban_fields = self._get_view_fields('booking', 'kanban')
+        with self.assertPerformance('booking_list_read'):
+            Booking.web_search_read([], list_fields, limit=80)
+        Booking.invalidate_cache()
+        with self.assertPerformance('booking_kanban_read'):
+            Booking.web_search_read([], kanban_fields, limit=80)
+
+    @warmup
+    def test_invitation_create(self):
+        vals_list = self._new_invitation_vals()
+        with self.assertPerformance('invitation_create'):
+            self.env['reception.invitation'].create(vals_list)
+
+    @warmup
+    def test_invitation_confirm(self):
+        invitations = self.env['reception.invitation'].create(self._new_invitation_vals())
+        with self.assertPerformance('invitation_confirm'):
+            invitations.action_confirm()
+
+    @warmup
+    def test_invitation_attend(self):
+        invitations = self.env['reception.invitation'].create(self._new_invitation_vals())
+        invitations.action_confirm()
+        with self.assertPerformance('invitation_attend'):
+            invitations.action_mark_attended()
+
+    @warmup
+    def test_invitation_read(self):
+        Invitation = self.env['reception.invitation'].with_user(self.officers[0])
+        list_fields = self._get_view_fields('reception.invitation', 'tree')
+        kanban_fields = self._get_view_fields('reception.invitation', 'kanban')
+        with self.assertPerformance('invitation_list_read'):
+            Invitation.web_search_read([], list_fields, limit=80)
+        Invitation.invalidate_cache()
+        with self.assertPerformance('invitation_kanban_read'):
+            Invitation.web_search_read([], kanban_fields, limit=80)
+
+    @warmup
+    def test_cron_overdue_invitations(self):
+        # The cold run clears the generated backlog, the warm run handles one batch
+        self.env['reception.invitation'].search([
+            ('state', '=', 'scheduled'),
+            ('invitation_datetime', '<', fields.Datetime.now())
+        ]).write({'state': 'overdue'})
+        invitations = self.env['reception.invitation'].create(self._new_invitation_vals())
+        invitations.action_confirm()
+        self.env.cr.execute(
+            "UPDATE reception_invitation SET invitation_datetime = %s WHERE id = ANY(%s)",
+            (fields.Datetime.now() - timedelta(hours=1), invitations.ids)
+        )
+        invitations.invalidate_cache()
+        with self.assertPerformance('cron_overdue_invitations'):
+            processed = self.env['reception.invitation'].check_overdue_invitations()
+        self.assertEqual(processed, len(invitations))
+
+    @warmup
+    def test_cron_due_payments(self):
+        self.env['scheduled.payment'].search([('is_notified', '=', False)]).write({'is_notified': True})
+        self.env['scheduled.payment'].create([{
+            'renter_id': self.renters[index % len(self.renters)].id,
+            'description': 'Perf Payment %s' % index,
+            'amount': 100.0,
+            'due_date': fields.Date.today(),
+        } for index in range(self.BATCH_SIZE)])
+        with self.assertPerformance('cron_due_payments'):
+            processed = self.env['building.renter'].check_due_payments()
+        self.assertEqual(processed, self.BATCH_SIZE)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.tests.common import TransactionCase, tagged
+from dateutil.relativedelta import relativedelta
+from datetime import timedelta
+
+
+@tagged('post_install', '-at_install')
+class TestScheduledPaymentPlan(TransactionCase):
+    """
+    Installment generation of payment plans started or rescheduled in the past and in the future
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestScheduledPaymentPlan, cls).setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('j_reception.payment_plan_window_days', 60)
+        officer = cls.env['res.users'].with_context(no_reset_password=True).create({
+            'name': 'Plan Officer',
+            'login': 'reception_plan_officer',
+        })
+        cls.renter = cls.env['building.renter'].create({
+            'company_id': cls.env['res.partner'].create({'name': 'Plan Company', 'is_company': True}).id,
+            'officer_id': officer.id,
+        })
+        cls.today = fields.Date.today()
+
+    def _create_plan(self, start_date, frequency='monthly'):
+        return self.env['scheduled.payment.plan'].create({
+            'renter_id': self.renter.id,
+            'description': 'Rent',
+            'amount': 1000.0,
+            'frequency': frequency,
+            'start_date': start_date,
+        })
+
+    def _due_dates(self, plan):
+        return sorted(plan.payment_ids.mapped('due_date'))
+
+    def test_future_start(self):
+        start = self.today + timedelta(days=10)
+        plan = self._create_plan(start)
+        self.assertEqual(self._due_dates(plan), [start, start + relativedelta(months=1)])
+        self.assertEqual(plan.installment_count, 2)
+        self.assertEqual(plan.next_due_date, start + relativedelta(months=2))
+
+    def test_past_start(self):
+        start = self.today - relativedelta(months=3, days=-1)
+        plan = self._create_plan(start)
+        # The past months are skipped, the first installment is the first one from today on
+        first_index = next(index for index in range(6) if start + relativedelta(months=index) >= self.today)
+        due_dates = self._due_dates(plan)
+        self.assertTrue(due_dates)
+        self.assertEqual(due_dates[0], start + relativedelta(months=first_index))
+        self.assertFalse(self.env['scheduled.payment'].search_count([
+            ('plan_id', '=', plan.id), ('due_date', '<', self.today)
+        ]))
+
+    def test_reschedule(self):
+        start = self.today + timedelta(days=10)
+        plan = self._create_plan(start)
+        new_start = self.today + timedelta(days=15)
+        plan.start_date = new_start
+        self.assertEqual(self._due_dates(plan), [new_start, new_start + relativedelta(months=1)])
+
+    def test_reschedule_keeps_notified(self):
+        start = self.today + timedelta(days=10)
+        plan = self._create_plan(start)
+        first = plan.payment_ids.filtered(lambda payment: payment.due_date == start)
+        first.is_notified = True
+        plan.frequency = 'weekly'
+        # The notified installment stays, the weekly ones follow it
+        self.assertEqual(
+            self._due_dates(plan),
+            [start + timedelta(weeks=week) for week in range(8) if start + timedelta(weeks=week) <= self.today + timedelta(days=60)]
+        )
+        self.assertIn(first, plan.payment_ids)
+
+    def test_reschedule_in_past(self):
+        plan = self._create_plan(self.today + timedelta(days=10), frequency='weekly')
+        new_start = self.today - timedelta(days=20)
+        plan.start_date = new_start
+        due_dates = self._due_dates(plan)
+        self.assertGreaterEqual(due_dates[0], self.today)
+        self.assertLess(due_dates[0], self.today + timedelta(weeks=1))
+        self.assertEqual((due_dates[0] - new_start).days % 7, 0)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Timezone helpers shared by the J Reception models, wizards and reports
+"""
+
+from functools import lru_cache
+import pytz
+
+# Timezone used when neither the building nor the user has one configured
+DEFAULT_TZ = 'Asia/Riyadh'
+
+# Format of the local dates shown in booking names and messages
+LOCAL_DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+
+
+@lru_cache(maxsize=64)
+def get_timezone(tz_name=None):
+    """
+    Return the pytz timezone of the given name, falling back on the default timezone
+
+    Zone objects are cached, so resolving a timezone inside record loops is free.
+    """
+    try:
+        return pytz.timezone(tz_name or DEFAULT_TZ)
+    except pytz.UnknownTimeZoneError:
+        return pytz.timezone(DEFAULT_TZ)
+
+
+def get_building_tz_name(env):
+    """
+    Return the name of the building timezone configured in the settings
+    """
+    return env['ir.config_parameter'].sudo().get_param('j_reception.building_tz') or DEFAULT_TZ
+
+
+def to_local(utc_datetime, tz_name=None):
+    """
+    Convert a naive UTC datetime to an aware datetime in the given timezone
+    """
+    return pytz.utc.localize(utc_datetime).astimezone(get_timezone(tz_name))
+
+
+def to_utc(local_datetime, tz_name=None):
+    """
+    Convert a naive datetime in the given timezone to a naive UTC datetime
+    """
+    return get_timezone(tz_name).localize(local_datetime).astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def format_local(utc_datetime, tz_name=None):
+    """
+    Format a naive UTC datetime in the given timezone for display
+    """
+    return to_local(utc_datetime, tz_name).strftime(LOCAL_DATETIME_FORMAT)
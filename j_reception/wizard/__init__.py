@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+Wizards package initialization for J Reception module
+"""
+from . import booking_recurrence_wizard
+from . import reception_invitation_import
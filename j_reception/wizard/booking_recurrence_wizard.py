@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Wizard for creating recurring facility bookings
+"""
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+from ..utils import to_local
+
+WEEKDAY_FIELDS = [
+    ('monday', 'MO'),
+    ('tuesday', 'TU'),
+    ('wednesday', 'WE'),
+    ('thursday', 'TH'),
+    ('friday', 'FR'),
+    ('saturday', 'SA'),
+    ('sunday', 'SU'),
+]
+
+
+class BookingRecurrenceWizard(models.TransientModel):
+    """
+    Wizard to book a facility on a recurring schedule
+    """
+    _name = 'booking.recurrence.wizard'
+    _description = 'Recurring Booking Wizard'
+
+    facility_id = fields.Many2one(
+        'facilities',
+        string='Facility',
+        required=True,
+        help='The facility being booked'
+    )
+    duration_id = fields.Many2one(
+        'duration',
+        string='Duration',
+        required=True,
+        help='Duration of every booking'
+    )
+    renter_id = fields.Many2one(
+        'building.renter',
+        string='Tenant',
+        required=True,
+        default=lambda self: self.env['booking']._get_default_renter(),
+        help='The tenant making the bookings'
+    )
+    booking_datetime = fields.Datetime(
+        string='First Booking',
+        required=True,
+        help='Date and time of the first booking'
+    )
+    frequency = fields.Selection([
+        ('daily', 'Days'),
+        ('weekly', 'Weeks'),
+        ('monthly', 'Months'),
+    ], string='Repeat Every', default='weekly', required=True,
+       help='Unit of the recurrence')
+    interval = fields.Integer(
+        string='Interval',
+        default=1,
+        required=True,
+        help='Repeat every N days, weeks or months'
+    )
+    monday = fields.Boolean(string='Monday')
+    tuesday = fields.Boolean(string='Tuesday')
+    wednesday = fields.Boolean(string='Wednesday')
+    thursday = fields.Boolean(string='Thursday')
+    friday = fields.Boolean(string='Friday')
+    saturday = fields.Boolean(string='Saturday')
+    sunday = fields.Boolean(string='Sunday')
+    end_type = fields.Selection([
+        ('count', 'Number of Bookings'),
+        ('until', 'End Date'),
+    ], string='Until', default='count', required=True,
+       help='How the recurrence ends')
+    count = fields.Integer(
+        string='Number of Bookings',
+        default=10,
+        help='Number of bookings to create'
+    )
+    until = fields.Date(
+        string='End Date',
+        help='Last day on which a booking can be created'
+    )
+
+    @api.onchange('booking_datetime')
+    def _onchange_booking_datetime(self):
+        """
+        Preselect the weekday of the first booking
+        """
+        if self.booking_datetime and not any(self[fname] for fname, dummy in WEEKDAY_FIELDS):
+            weekday = to_local(self.booking_datetime, self.env.user.tz).weekday()
+            self[WEEKDAY_FIELDS[weekday][0]] = True
+
+    def _get_recurrence_rule(self):
+        """
+        Build the RRULE string of the recurrence
+        """
+        self.ensure_one()
+        if self.interval < 1:
+            raise UserError(_("The recurrence interval must be at least 1."))
+        rule = 'FREQ=%s;INTERVAL=%s' % (self.frequency.upper(), self.interval)
+        if self.frequency == 'weekly':
+            weekdays = [day for fname, day in WEEKDAY_FIELDS if self[fname]]
+            if weekdays:
+                rule += ';BYDAY=%s' % ','.join(weekdays)
+        if self.end_type == 'count':
+            if self.count < 1:
+                raise UserError(_("The number of bookings must be at least 1."))
+            rule += ';COUNT=%s' % self.count
+        else:
+            if not self.until:
+                raise UserError(_("Please set the end date of the recurrence."))
+            rule += ';UNTIL=%s' % self.until.strftime('%Y%m%dT235959')
+        return rule
+
+    def action_create_bookings(self):
+        """
+        Create all bookings of the recurrence in one batch and show them
+        """
+        self.ensure_one()
+        bookings = self.env['booking'].create({
+            'facility_id': self.facility_id.id,
+            'duration_id': self.duration_id.id,
+            'renter_id': self.renter_id.id,
+            'booking_datetime': self.booking_datetime,
+            'recurrence_rule': self._get_recurrence_rule(),
+        })
+        action = self.env.ref('j_reception.action_booking_tree').read()[0]
+        action['domain'] = [('id', 'in', bookings.ids)]
+        action['view_mode'] = 'tree,form,calendar,kanban'
+        action['views'] = [(False, 'tree'), (False, 'form'), (False, 'calendar'), (False, 'kanban')]
+        return action
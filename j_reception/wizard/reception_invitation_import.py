@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Wizard for importing guests and their invitations from a CSV or XLSX file
+"""
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+from odoo.tools import email_normalize
+from datetime import datetime
+import base64
+import csv
+import io
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+from ..utils import to_utc
+
+# Number of invitations created per create call
+IMPORT_BATCH_SIZE = 500
+# Accepted formats for the invitation date column
+IMPORT_DATETIME_FORMATS = ['%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M']
+
+
+class ReceptionInvitationImport(models.TransientModel):
+    """
+    Wizard to import guests and create their invitations in batches
+    """
+    _name = 'reception.invitation.import'
+    _description = 'Import Guest Invitations'
+
+    file = fields.Binary(
+        string='File',
+        required=True,
+        help='CSV or XLSX file with the columns name, email, phone, date and subject'
+    )
+    filename = fields.Char(
+        string='File Name'
+    )
+    officer_id = fields.Many2one(
+        'res.users',
+        string='Officer',
+        required=True,
+        default=lambda self: self.env.user,
+        domain=lambda self: [('id', 'in', list(self.env['building.renter']._get_officer_renter_map()))],
+        help='The user responsible for the imported invitations'
+    )
+    subject = fields.Char(
+        string='Default Subject',
+        help='Subject of the invitations whose row has no subject'
+    )
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('error', 'Error'),
+    ], string='State', default='draft', required=True)
+    error_report = fields.Text(
+        string='Errors',
+        readonly=True,
+        help='Rows that could not be imported, nothing is imported while errors remain'
+    )
+
+    def _read_rows(self):
+        """
+        Yield the rows of the uploaded file as dicts keyed by lowercase column name
+        """
+        self.ensure_one()
+        content = base64.b64decode(self.file)
+        if (self.filename or '').lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise UserError(_("Importing XLSX files requires the openpyxl Python library."))
+            workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell or '').strip().lower() for cell in next(rows, [])]
+            for row in rows:
+                if any(cell not in (None, '') for cell in row):
+                    yield dict(zip(header, row))
+        else:
+            # Decoded while reading, so the whole file is never held as text
+            reader = csv.DictReader(io.TextIOWrapper(io.BytesIO(content), encoding='utf-8-sig', newline=''))
+            reader.fieldnames = [(name or '').strip().lower() for name in reader.fieldnames or []]
+            for row in reader:
+                if any((value or '').strip() for value in row.values() if isinstance(value, str)):
+                    yield row
+
+    def _parse_datetime(self, value, user_tz):
+        """
+        Return the UTC datetime of a date cell given in the user's timezone, or None
+        """
+        if isinstance(value, datetime):
+            local_datetime = value
+        else:
+            local_datetime = None
+            for date_format in IMPORT_DATETIME_FORMATS:
+                try:
+                    local_datetime = datetime.strptime(str(value or '').strip(), date_format)
+                    break
+                except ValueError:
+                    continue
+            if not local_datetime:
+                return None
+        return to_utc(local_datetime, user_tz)
+
+    def _validate_rows(self):
+        """
+        Validate every row up front and return (guests, errors)
+
+        guests is a list of dicts with the cleaned values of the valid rows and
+        errors a list of messages, one per invalid row.
+        """
+        user_tz = self.env.user.tz
+        now = fields.Datetime.now()
+        guests = []
+        errors = []
+        rows = self._read_rows()
+        try:
+            for row_number, row in enumerate(rows, start=2):
+                name = str(row.get('name') or '').strip()
+                email = email_normalize(str(row.get('email') or ''))
+                invitation_datetime = self._parse_datetime(row.get('date'), user_tz)
+                subject = str(row.get('subject') or '').strip() or self.subject
+                row_errors = []
+                if not name:
+                    row_errors.append(_("the name is missing"))
+                if not email:
+                    row_errors.append(_("the email is missing or invalid"))
+                if not invitation_datetime:
+                    row_errors.append(_("the date is missing or not in the YYYY-MM-DD HH:MM format"))
+                elif invitation_datetime <= now:
+                    row_errors.append(_("the date must be in the future"))
+                if not subject:
+                    row_errors.append(_("the subject is missing"))
+                if row_errors:
+                    errors.append(_("Row %s: %s") % (row_number, ', '.join(row_errors)))
+                    continue
+                guests.append({
+                    'name': name,
+                    'email': email,
+                    'phone': str(row.get('phone') or '').strip(),
+                    'invitation_datetime': invitation_datetime,
+                    'subject': subject,
+                })
+        except UnicodeDecodeError:
+            return [], [_("The file could not be read: save it as a UTF-8 encoded CSV file or as an XLSX file.")]
+        return guests, errors
+
+    def _get_guest_partners(self, guests):
+        """
+        Return a mapping {normalized email: partner}, creating the missing partners in one batch
+        """
+        Partner = self.env['res.partner']
+        emails = list({guest['email'] for guest in guests})
+        partners_by_email = {}
+        # Looked up in batches through res_partner_email_normalized_idx
+        for index in range(0, len(emails), IMPORT_BATCH_SIZE):
+            for partner in Partner.search([('email_normalized', 'in', emails[index:index + IMPORT_BATCH_SIZE])], order='id'):
+                partners_by_email.setdefault(partner.email_normalized, partner)
+
+        new_partner_vals = {}
+        for guest in guests:
+            if guest['email'] not in partners_by_email and guest['email'] not in new_partner_vals:
+                new_partner_vals[guest['email']] = {
+                    'name': guest['name'],
+                    'email': guest['email'],
+                    'phone': guest['phone'] or False,
+                }
+        if new_partner_vals:
+            for email, partner in zip(new_partner_vals, Partner.create(list(new_partner_vals.values()))):
+                partners_by_email[email] = partner
+        return partners_by_email
+
+    def action_import(self):
+        """
+        Import the file: validate all rows, then create partners and invitations in batches
+        """
+        self.ensure_one()
+        guests, errors = self._validate_rows()
+        if not guests and not errors:
+            errors.append(_("The file does not contain any guest."))
+        if errors:
+            self.write({'state': 'error', 'error_report': '\n'.join(errors)})
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': self._name,
+                'res_id': self.id,
+                'view_mode': 'form',
+                'target': 'new',
+            }
+
+        partners_by_email = self._get_guest_partners(guests)
+        vals_list = [{
+            'officer_id': self.officer_id.id,
+            'guest_partner_id': partners_by_email[guest['email']].id,
+            'invitation_datetime': guest['invitation_datetime'],
+            'subject': guest['subject'],
+        } for guest in guests]
+
+        Invitation = self.env['reception.invitation']
+        invitations = Invitation.browse()
+        for index in range(0, len(vals_list), IMPORT_BATCH_SIZE):
+            invitations |= Invitation.create(vals_list[index:index + IMPORT_BATCH_SIZE])
+
+        action = self.env.ref('j_reception.action_reception_invitation_tree').read()[0]
+        action['domain'] = [('id', 'in', invitations.ids)]
+        return action